@@ -95,7 +95,9 @@ function Hist-Clear {
   $p = $env:HIST_LEDGER
   if (-not $p) { $p = "data/historian/ledger.jsonl" }
   if (Test-Path $p) {
-    Remove-Item $p
+    # Truncate rather than delete: a running API keeps the ledger open, and Windows
+    # refuses to remove an open file.
+    Clear-Content $p
     "Cleared $p"
   } else {
     "No ledger at $p"
@@ -2,25 +2,41 @@
 
 from __future__ import annotations
 
-import hashlib
+import asyncio
 import logging
 import os
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, File, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from ..core.chunk import chunk_text, format_page_label, map_offsets_to_page_range
+from ..core.chunk import (
+    chunk_text,
+    content_hash,
+    format_page_label,
+    map_chunks_to_page_ranges,
+)
 from ..core.embeddings import EmbeddingService
 from ..core.field_extract import extract_fields
 from ..core.parse_pdf import extract_text_from_pdf
-from ..core.query_rewrite import expand_query
+from ..core.query_rewrite import (
+    STRUCTURED_FIELDS,
+    expand_query,
+    match_structured_phrase,
+    normalize_query,
+)
 from ..core.retrieval import Retriever
+from ..core.semantic_cache import SemanticCache
 from ..historian import Ledger
-from ..historian.schema import IngestEvent, Marker, QueryEvent, RetrievalHit
+from ..historian.schema import (
+    Marker,
+    make_ingest_event,
+    make_query_event,
+    make_retrieval_hit,
+)
 from ..llm.openai_client import OpenAIClient
 from ..store.faiss_store import FaissVectorStore, Metadata
 
@@ -29,6 +45,13 @@ load_dotenv()
 LOGGER = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Resolved once at import; the handlers below run per request.
+DEFAULT_TOP_K = int(os.getenv("TOP_K", "3"))
+CHAT_MODEL = os.getenv("CHAT_MODEL", "gpt-4o-mini")
+MAX_TOKENS = int(os.getenv("MAX_TOKENS", "300"))
+TEMPERATURE = float(os.getenv("TEMPERATURE", "0.2"))
+DEFAULT_FILENAME = "uploaded.pdf"
+
 app = FastAPI(title="Policy Assistant POC", version="0.1.0")
 app.add_middleware(
     CORSMiddleware,
@@ -41,8 +64,10 @@ app.add_middleware(
 vector_store = FaissVectorStore()
 embedding_service = EmbeddingService()
 retriever = Retriever(vector_store)
-openai_client = OpenAIClient()
+openai_client = OpenAIClient.shared()
 ledger = Ledger()
+semantic_cache = SemanticCache()
+_inflight_chats: Dict[Tuple[str, Tuple[str, ...]], asyncio.Future[str]] = {}
 
 
 def get_retriever() -> Retriever:
@@ -64,33 +89,40 @@ async def ingest(
     embeddings: EmbeddingService = Depends(get_embedding_service),  # noqa: B008
 ) -> JSONResponse:
     start = time.monotonic()
-    content = await file.read()
-    text, page_breaks = extract_text_from_pdf(content, filename=file.filename)
+    filename = file.filename or DEFAULT_FILENAME
+    # Parse straight from the upload's spooled temp file instead of reading it into memory.
+    text, page_breaks = await asyncio.to_thread(
+        extract_text_from_pdf, file.file, filename=file.filename
+    )
     if not text:
         raise HTTPException(status_code=400, detail="No text could be extracted from PDF")
 
     fields = extract_fields(text)
 
-    chunks = chunk_text(text)
-    documents = [chunk.text for chunk in chunks]
-    vectors = embeddings.embed_documents(documents)
+    chunks = await asyncio.to_thread(chunk_text, text)
+    vectors = await asyncio.to_thread(embeddings.embed_documents, (chunk.text for chunk in chunks))
 
     metadata_items: List[Metadata] = []
-    for chunk, _vector in zip(chunks, vectors, strict=True):
-        page_start, page_end = map_offsets_to_page_range(chunk, page_breaks)
+    page_ranges = map_chunks_to_page_ranges(chunks, page_breaks)
+    for chunk, _vector, (page_start, page_end) in zip(chunks, vectors, page_ranges, strict=True):
         metadata_items.append(
             Metadata(
-                document_id=file.filename or "uploaded.pdf",
+                document_id=filename,
                 chunk_id=chunk.id,
                 text=chunk.text,
-                source=file.filename or "uploaded.pdf",
+                source=filename,
                 page_start=page_start,
                 page_end=page_end,
                 fields=dict(fields),
+                content_hash=content_hash(chunk.text),
             )
         )
 
-    vector_store.add(vectors, metadata_items)
+    await asyncio.to_thread(vector_store.add, vectors, metadata_items)
+    # The upload is only acknowledged once its chunks are on disk.
+    await asyncio.to_thread(vector_store.flush)
+    # Cached answers may no longer reflect the corpus.
+    semantic_cache.clear()
     elapsed = time.monotonic() - start
     duration_ms = int(elapsed * 1000)
     chunk_count = len(chunks)
@@ -107,13 +139,13 @@ async def ingest(
         markers.append(Marker(type="Note", text=f"Extracted fields: {summary}"))
 
     ledger.append(
-        IngestEvent(
-            filename=file.filename or "uploaded.pdf",
+        make_ingest_event(
+            filename=filename,
             chunks=chunk_count,
             embed_batches=embed_batches,
             duration_ms=duration_ms,
             markers=markers,
-        ).model_dump()
+        )
     )
     return JSONResponse(
         {
@@ -142,75 +174,89 @@ async def query(
     elif isinstance(top_k_value, str):
         top_k = int(top_k_value)
     else:
-        top_k = int(os.getenv("TOP_K", "3"))
+        top_k = DEFAULT_TOP_K
     redact = payload.get("redact")
 
+    normalized_query = normalize_query(query_text)
+    matched_phrase = match_structured_phrase(normalized_query)
+    requested_field = STRUCTURED_FIELDS[matched_phrase][0] if matched_phrase else None
+
+    cache_key = (top_k, redact)
+    if requested_field is None:
+        cached = semantic_cache.lookup_text(normalized_query, key=cache_key)
+        if cached is not None:
+            return _serve_cached(query_text, cached, started=start)
+
     expanded_query = expand_query(query_text)
-    query_vector = embeddings.embed_query(expanded_query)
-    results = store_retriever.search(query_vector, top_k=top_k, redact=redact)
+    query_vector = await asyncio.to_thread(embeddings.embed_query, expanded_query)
+    if requested_field is None:
+        cached = semantic_cache.lookup(query_vector, key=cache_key)
+        if cached is not None:
+            return _serve_cached(query_text, cached, started=start)
+
+    results = await asyncio.to_thread(
+        store_retriever.search, query_vector, top_k=top_k, redact=redact
+    )
 
     if not results:
         return JSONResponse({"answer": "I don't know.", "sources": []})
 
-    lower_query = query_text.lower()
-    structured_map = {
-        "estimated total premium": "estimated_total_premium",
-        "total premium": "estimated_total_premium",
-        "policy number": "policy_number",
-        "premium at inception": "premium_at_inception",
-    }
-    matched_phrase = None
-    requested_field = None
-    for phrase in sorted(structured_map.keys(), key=len, reverse=True):
-        if phrase in lower_query:
-            matched_phrase = phrase
-            requested_field = structured_map[phrase]
-            break
-
     field_metadata = None
     field_value = None
     field_from_results = False
-    if requested_field:
-        for chunk in results:
-            value = chunk.metadata.fields.get(requested_field)
+    snippets: List[str] = []
+    sources: List[Dict[str, Any]] = []
+    # Ledger-shaped hit dicts: shared by the semantic cache and every ledger record of
+    # this answer without building or validating models.
+    rhits: List[Dict[str, Any]] = []
+    for score, chunk_id, text, source, meta in zip(
+        results.scores.tolist(),
+        results.chunk_ids,
+        results.texts,
+        results.sources,
+        results.metadatas,
+        strict=True,
+    ):
+        snippets.append(text[:500])
+        sources.append(
+            {
+                "source": source,
+                "chunk_id": chunk_id,
+                "score": score,
+                "page_start": meta.page_start,
+                "page_end": meta.page_end,
+            }
+        )
+        rhits.append(
+            make_retrieval_hit(
+                source=source,
+                # Hash the stored text, not the (possibly redacted) response text.
+                chunk_id=meta.content_hash or content_hash(meta.text),
+                score=score,
+                preview=text[:300],
+                page_start=meta.page_start,
+                page_end=meta.page_end,
+            )
+        )
+        if requested_field and field_metadata is None:
+            value = meta.fields.get(requested_field)
             if value:
-                field_metadata = chunk.metadata
+                field_metadata = meta
                 field_value = value
                 field_from_results = True
-                break
-        if field_metadata is None:
-            for meta in store_retriever.store.metadata:
-                value = meta.fields.get(requested_field)
-                if value:
-                    field_metadata = meta
-                    field_value = value
-                    break
-
-    snippets = [chunk.text[:500] for chunk in results]
-    sources = [
-        {
-            "source": chunk.source,
-            "chunk_id": chunk.chunk_id,
-            "score": chunk.score,
-            "page_start": chunk.metadata.page_start,
-            "page_end": chunk.metadata.page_end,
-        }
-        for chunk in results
-    ]
+    if requested_field and field_metadata is None:
+        field_metadata = store_retriever.store.find_field(requested_field)
+        if field_metadata is not None:
+            field_value = field_metadata.fields[requested_field]
 
     markers = [Marker(type="Decision", text="Answer grounded in retrieved context")]
 
-    if requested_field and field_metadata and field_value:
-        if matched_phrase == "estimated total premium":
-            display_label = "Estimated total premium"
-        elif matched_phrase == "total premium":
-            display_label = "Total premium"
-        elif matched_phrase == "premium at inception":
-            display_label = "Premium at inception"
-        else:
-            display_label = "Policy number"
-
-        page_label = format_page_label(field_metadata.page_start, field_metadata.page_end)
+    if matched_phrase and field_metadata and field_value:
+        display_label = STRUCTURED_FIELDS[matched_phrase][1]
+
+        page_label = field_metadata.page_label or format_page_label(
+            field_metadata.page_start, field_metadata.page_end
+        )
         page_note = f" | {page_label}" if page_label else ""
         answer = (
             f"{display_label}: {field_value} "
@@ -232,35 +278,70 @@ async def query(
         context_blocks = store_retriever.build_context(results)
         if not context_blocks:
             return JSONResponse({"answer": "I don't know.", "sources": []})
-        answer = openai_client.chat(query=query_text, context_blocks=context_blocks)
-
-    duration_ms = int((time.monotonic() - start) * 1000)
-    rhits: List[RetrievalHit] = []
-    for chunk in results:
-        hasher = hashlib.sha1()
-        hasher.update(chunk.text.encode("utf-8"))
-        rhits.append(
-            RetrievalHit(
-                source=chunk.source,
-                chunk_id=hasher.hexdigest()[:12],
-                score=chunk.score,
-                preview=chunk.text[:300],
-                page_start=chunk.metadata.page_start,
-                page_end=chunk.metadata.page_end,
-            )
+        answer = await _coalesced_chat(query_text, context_blocks)
+        semantic_cache.store(
+            query_vector,
+            {"answer": answer, "snippets": snippets, "sources": sources, "hits": rhits},
+            key=cache_key,
+            text=normalized_query,
         )
 
+    _record_query(query_text, hits=rhits, answer=answer, markers=markers, started=start)
+    return JSONResponse({"answer": answer, "snippets": snippets, "sources": sources})
+
+
+def _serve_cached(query_text: str, cached: Dict[str, Any], *, started: float) -> JSONResponse:
+    _record_query(
+        query_text,
+        hits=cached["hits"],
+        answer=cached["answer"],
+        markers=[Marker(type="Note", text="Semantic cache hit")],
+        started=started,
+    )
+    return JSONResponse(
+        {
+            "answer": cached["answer"],
+            "snippets": cached["snippets"],
+            "sources": cached["sources"],
+        }
+    )
+
+
+async def _coalesced_chat(query_text: str, context_blocks: List[str]) -> str:
+    """Run the chat call, sharing one in-flight completion between identical requests."""
+    key = (query_text, tuple(context_blocks))
+    pending = _inflight_chats.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    task = asyncio.ensure_future(
+        asyncio.to_thread(openai_client.chat, query=query_text, context_blocks=context_blocks)
+    )
+    _inflight_chats[key] = task
+    try:
+        return await asyncio.shield(task)
+    finally:
+        _inflight_chats.pop(key, None)
+
+
+def _record_query(
+    query_text: str,
+    *,
+    hits: List[Dict[str, Any]],
+    answer: str,
+    markers: List[Marker],
+    started: float,
+) -> None:
+    duration_ms = int((time.monotonic() - started) * 1000)
     ledger.append(
-        QueryEvent(
+        make_query_event(
             query=query_text,
-            top_k=len(results),
-            hits=rhits,
-            model=os.getenv("CHAT_MODEL", "gpt-4o-mini"),
-            max_tokens=int(os.getenv("MAX_TOKENS", "300")),
-            temperature=float(os.getenv("TEMPERATURE", "0.2")),
+            top_k=len(hits),
+            hits=hits,
+            model=CHAT_MODEL,
+            max_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE,
             latency_ms=duration_ms,
             answer_chars=len(answer),
             markers=markers,
-        ).model_dump()
+        )
     )
-    return JSONResponse({"answer": answer, "snippets": snippets, "sources": sources})
@@ -2,15 +2,16 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
-import math
 import os
 import re
-import uuid
 from bisect import bisect_right
 from dataclasses import dataclass
 from typing import Iterable, List, Sequence, Tuple
 
+import numpy as np
+
 LOGGER = logging.getLogger(__name__)
 
 try:  # pragma: no cover - optional dependency
@@ -67,67 +68,51 @@ def chunk_text(
         overlap if overlap is not None else _get_env_int("CHUNK_OVERLAP", DEFAULT_OVERLAP)
     )
 
-    cleaned = text.strip()
-    if not cleaned:
+    if not text.strip():
         return []
 
-    sentences = _split_into_sentences(cleaned)
+    max_len = max(1, resolved_max_chars)
+    spans: List[Tuple[int, int]] = []
+    for start, end in _sentence_spans(text):
+        if end - start > max_len:
+            spans.extend(_hard_split(start, end, max_len))
+        else:
+            spans.append((start, end))
+    if not spans:
+        return []
+
+    # Chunk boundaries are found with binary searches over sentence end offsets and
+    # each chunk is a single slice of ``text``; nothing is re-joined per sentence.
+    ends = [end for _start, end in spans]
+    document_hash = hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
     chunks: List[Chunk] = []
-    buffer: list[str] = []
-    start_index = 0
-
-    def flush_buffer() -> None:
-        nonlocal buffer, start_index
-        if not buffer:
-            return
-        chunk_text_value = " ".join(buffer).strip()
-        if not chunk_text_value:
-            buffer = []
-            return
-        chunk_id = str(uuid.uuid4())
-        end_index = start_index + len(chunk_text_value)
-        chunks.append(Chunk(id=chunk_id, text=chunk_text_value, start=start_index, end=end_index))
-        # prepare overlap
+    index = 0
+    position = spans[0][0]
+    while index < len(spans):
+        span_start, span_end = spans[index]
+        if span_end - position > max_len:
+            # the overlap leaves no room for the next sentence; shrink it
+            position = min(_skip_whitespace(text, span_end - max_len), span_start)
+        last = bisect_right(ends, position + max_len) - 1
+        chunk_end = ends[last]
+        chunks.append(
+            Chunk(
+                id=f"{document_hash}-{len(chunks):06x}",
+                text=text[position:chunk_end],
+                start=position,
+                end=chunk_end,
+            )
+        )
+        index = last + 1
+        if index >= len(spans):
+            break
+        next_start = spans[index][0]
         if resolved_overlap > 0:
-            overlap_text = chunk_text_value[-resolved_overlap:].lstrip()
-            buffer = [overlap_text] if overlap_text else []
+            # An overlap as long as the chunk itself must never restart at or before it.
+            overlap_start = _skip_whitespace(text, chunk_end - resolved_overlap)
+            position = max(position + 1, min(overlap_start, next_start))
         else:
-            buffer = []
-        start_index = max(0, end_index - resolved_overlap)
-
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-
-        if len(sentence) > resolved_max_chars:
-            flush_buffer()
-            for piece in _hard_split(sentence, resolved_max_chars):
-                chunk_id = str(uuid.uuid4())
-                end_index = start_index + len(piece)
-                chunks.append(Chunk(id=chunk_id, text=piece, start=start_index, end=end_index))
-                start_index = max(0, end_index - resolved_overlap)
-            continue
-
-        prospective = len(" ".join(buffer + [sentence]).strip()) if buffer else len(sentence)
-        if prospective > resolved_max_chars:
-            flush_buffer()
-            # after flush, buffer may contain overlap text; re-evaluate length
-            prospective = len(" ".join(buffer + [sentence]).strip()) if buffer else len(sentence)
-            while prospective > resolved_max_chars:
-                # sentence itself still too long with overlap; split sentence and continue
-                for piece in _hard_split(sentence, resolved_max_chars):
-                    chunk_id = str(uuid.uuid4())
-                    end_index = start_index + len(piece)
-                    chunks.append(Chunk(id=chunk_id, text=piece, start=start_index, end=end_index))
-                    start_index = max(0, end_index - resolved_overlap)
-                sentence = ""
-                break
-            if not sentence:
-                continue
-        buffer.append(sentence)
-
-    flush_buffer()
+            position = next_start
     return chunks
 
 
@@ -151,6 +136,27 @@ def map_offsets_to_page_range(chunk: Chunk, page_breaks: Sequence[int]) -> Tuple
     return (start_page_index + 1, end_page_index + 1)
 
 
+def map_chunks_to_page_ranges(
+    chunks: Sequence[Chunk], page_breaks: Sequence[int]
+) -> List[Tuple[int, int]]:
+    """Vectorised ``map_offsets_to_page_range`` for every chunk of a document."""
+
+    if not chunks:
+        return []
+    if not page_breaks:
+        return [(1, 1)] * len(chunks)
+
+    breaks = np.asarray(page_breaks, dtype=np.int64)
+    starts = np.fromiter((chunk.start for chunk in chunks), dtype=np.int64, count=len(chunks))
+    ends = np.fromiter((chunk.end - 1 for chunk in chunks), dtype=np.int64, count=len(chunks))
+    ends = np.maximum(starts, ends)
+
+    last_index = len(page_breaks) - 1
+    start_pages = np.clip(np.searchsorted(breaks, starts, side="right") - 1, 0, last_index) + 1
+    end_pages = np.clip(np.searchsorted(breaks, ends, side="right") - 1, 0, last_index) + 1
+    return list(zip(start_pages.tolist(), end_pages.tolist(), strict=True))
+
+
 def format_page_label(page_start: int | None, page_end: int | None) -> str:
     """Return a human-readable label for a page range."""
 
@@ -161,20 +167,53 @@ def format_page_label(page_start: int | None, page_end: int | None) -> str:
     return f"Pages {page_start}–{page_end}"
 
 
-def _split_into_sentences(text: str) -> Iterable[str]:
-    if sent_tokenize is None:
-        return re.split(r"(?<=[.!?])\s+", text)
-    try:  # pragma: no cover
-        return sent_tokenize(text)
-    except LookupError:  # pragma: no cover
-        LOGGER.warning("NLTK punkt model missing; using regex fallback")
-        return re.split(r"(?<=[.!?])\s+", text)
+# Never updated; copied per digest so parameter setup happens once.
+_CONTENT_HASH_TEMPLATE = hashlib.blake2b(digest_size=6)
+
+
+def content_hash(text: str) -> str:
+    """Return a short, stable digest of chunk text for ledger references."""
+
+    hasher = _CONTENT_HASH_TEMPLATE.copy()
+    hasher.update(text.encode("utf-8"))
+    return hasher.hexdigest()
 
 
-def _hard_split(sentence: str, max_chars: int) -> Iterable[str]:
-    total = len(sentence)
-    parts = int(math.ceil(total / max_chars))
-    for i in range(parts):
-        start = i * max_chars
-        end = min(start + max_chars, total)
-        yield sentence[start:end]
+_SENTENCE_RE = re.compile(r"\S(?:.*?[.!?](?=\s)|.*\S)?", re.DOTALL)
+_NON_SPACE_RE = re.compile(r"\S")
+
+
+def _sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """Return ``(start, end)`` offsets of each sentence in ``text``."""
+
+    if sent_tokenize is not None:  # pragma: no cover - optional dependency
+        try:
+            sentences = sent_tokenize(text)
+        except LookupError:
+            LOGGER.warning("NLTK punkt model missing; using regex fallback")
+        else:
+            spans: List[Tuple[int, int]] = []
+            cursor = 0
+            for sentence in sentences:
+                sentence = sentence.strip()
+                if not sentence:
+                    continue
+                found = text.find(sentence, cursor)
+                if found == -1:
+                    break
+                cursor = found + len(sentence)
+                spans.append((found, cursor))
+            else:
+                return spans
+            LOGGER.warning("NLTK sentences did not align with source text; using regex")
+    return [match.span() for match in _SENTENCE_RE.finditer(text)]
+
+
+def _skip_whitespace(text: str, position: int) -> int:
+    match = _NON_SPACE_RE.search(text, max(0, position))
+    return match.start() if match else len(text)
+
+
+def _hard_split(start: int, end: int, max_chars: int) -> Iterable[Tuple[int, int]]:
+    for piece_start in range(start, end, max_chars):
+        yield piece_start, min(piece_start + max_chars, end)
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import functools
 import os
+import random
 import threading
 import time
 from dataclasses import dataclass
@@ -17,7 +19,7 @@ def estimate_tokens(text: str) -> int:
 
 
 class RateLimiter:
-    """Simple thread-safe rate limiter."""
+    """Thread-safe token bucket; callers that must wait sleep outside the lock."""
 
     def __init__(self, rate_per_sec: float) -> None:
         self.rate_per_sec = rate_per_sec
@@ -28,33 +30,35 @@ class RateLimiter:
     def acquire(self) -> None:
         if self.rate_per_sec <= 0:
             return
+        rate = self.rate_per_sec
         with self._lock:
             current = time.monotonic()
-            elapsed = current - self._last
+            tokens = min(rate, self._tokens + (current - self._last) * rate) - 1
+            self._tokens = tokens
             self._last = current
-            self._tokens += elapsed * self.rate_per_sec
-            if self._tokens > self.rate_per_sec:
-                self._tokens = self.rate_per_sec
-            if self._tokens < 1:
-                wait_time = (1 - self._tokens) / self.rate_per_sec
-                time.sleep(wait_time)
-                self._tokens = 0
-            else:
-                self._tokens -= 1
+        # A negative balance reserves a future slot: concurrent waiters queue up
+        # behind each other without holding the lock while they sleep.
+        if tokens < 0:
+            time.sleep(-tokens / rate)
 
 
 def exponential_backoff(
     *,
     initial: float = 0.5,
     maximum: float = 8.0,
+    jitter: float = 0.5,
 ) -> Iterator[float]:
+    """Yield doubling waits capped at ``maximum``, each scaled by ``1 ± jitter``.
+
+    Jitter spreads out retries from concurrent callers that failed together.
+    """
     wait = initial
     while True:
-        yield min(wait, maximum)
+        yield min(wait, maximum) * random.uniform(1 - jitter, 1 + jitter)
         wait = min(wait * 2, maximum)
 
 
-@dataclass
+@dataclass(slots=True)
 class CircuitBreaker:
     failure_threshold: int = 5
     reset_timeout: float = 60.0
@@ -85,7 +89,7 @@ class CircuitBreaker:
             self.open_state = True
 
 
-@dataclass
+@dataclass(slots=True)
 class CostGuard:
     rate_limiter: RateLimiter
     circuit_breaker: CircuitBreaker
@@ -111,6 +115,20 @@ class CostGuard:
             temperature=temperature,
         )
 
+    @classmethod
+    def shared(cls) -> "CostGuard":
+        """Process-wide guard parsed from the environment on first use.
+
+        Every client shares one rate limiter, circuit breaker and usage counters, so
+        limits apply to the process as a whole rather than per client instance.
+        """
+        return _shared_cost_guard()
+
+    @classmethod
+    def reset_shared(cls) -> None:
+        """Forget the process-wide guard; the next ``shared()`` re-reads the environment."""
+        _shared_cost_guard.cache_clear()
+
     def before_request(self) -> None:
         if not self.circuit_breaker.allow():
             raise RuntimeError("Circuit breaker open due to repeated failures")
@@ -131,3 +149,8 @@ class CostGuard:
             estimated += estimate_tokens(completion)
         if estimated > self.max_tokens:
             raise ValueError("Estimated tokens exceed configured max")
+
+
+@functools.cache
+def _shared_cost_guard() -> CostGuard:
+    return CostGuard.from_env()
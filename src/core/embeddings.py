@@ -3,86 +3,233 @@
 from __future__ import annotations
 
 import hashlib
+import logging
 import os
-import pickle
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
 
+import numpy as np
 from dotenv import load_dotenv
 
 from ..llm.openai_client import OpenAIClient
 from .cost_guard import estimate_tokens
 
+LOGGER = logging.getLogger(__name__)
+
 load_dotenv()
 
-CACHE_FILE = Path(os.getenv("EMBED_CACHE_PATH", "data/emb_cache.pkl"))
+CACHE_FILE = Path(os.getenv("EMBED_CACHE_PATH", "data/emb_cache.bin"))
 BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# Estimated tokens per embeddings request; the API rejects requests over 300k tokens.
+BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "250000"))
 MAX_EMBED_TOKENS = int(os.getenv("MAX_EMBED_TOKENS", "6000"))
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "2048"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+
+# Keys are 128-bit BLAKE2b digests of the input text; the template is copied per key.
+_KEY_HASH_TEMPLATE = hashlib.blake2b(digest_size=16)
+
+# Cache file layout: versioned magic header, then an append-only log of frames:
+# >BI (key length, vector byte length) + UTF-8 key + little-endian float32 vector.
+# Later frames for a key win; the log is compacted on load once it is mostly stale.
+_CACHE_MAGIC = b"EMBC2\n"
+_FRAME_HEADER = struct.Struct(">BI")
+_VECTOR_DTYPE = np.dtype("<f4")
 
 
 class EmbeddingService:
     def __init__(
         self, *, client: OpenAIClient | None = None, cache_file: Path | None = None
     ) -> None:
-        self.client = client or OpenAIClient()
+        self.client = client or OpenAIClient.shared()
         self.cache_file = cache_file or CACHE_FILE
         self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-        self._cache: Dict[str, List[float]] = self._load_cache()
+        self._lock = threading.Lock()
+        self._dirty_keys: Set[str] = set()
+        self._needs_rewrite = False
+        self._cache: Dict[str, np.ndarray] = self._load_cache()
+        if self._needs_rewrite:
+            self._rewrite_cache()
         self.embed_max_tokens = MAX_EMBED_TOKENS
-
-    def embed_documents(self, texts: Sequence[str]) -> List[List[float]]:
-        return self._embed(texts)
-
-    def embed_query(self, text: str) -> List[float]:
-        return self._embed([text])[0]
-
-    def _embed(self, texts: Sequence[str]) -> List[List[float]]:
+        self._query_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    def embed_documents(self, texts: Iterable[str]) -> np.ndarray:
+        """Return an ``(N, D)`` float32 matrix, one row per input text."""
+        vectors = self._embed(texts if isinstance(texts, Sequence) else list(texts))
+        if not vectors:
+            return np.empty((0, 0), dtype=_VECTOR_DTYPE)
+        return np.stack(vectors)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        # Queries repeat verbatim (modulo case/spacing) far more often than documents, so
+        # keep a small in-memory LRU in front of the hashed cache.
+        key = " ".join(text.split()).lower()
+        with self._lock:
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                self._query_cache.move_to_end(key)
+                return cached
+        vector = self._cache.get(self._hash_text(text))
+        if vector is None:
+            vector = self._embed([text])[0]
+        if QUERY_CACHE_SIZE > 0:
+            with self._lock:
+                self._query_cache[key] = vector
+                if len(self._query_cache) > QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+        return vector
+
+    def _embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        order = list(map(self._hash_text, texts))
+        cache = self._cache
+        try:
+            # Fully cached inputs (re-runs, eval loops) skip dedup, batching and persistence.
+            return [cache[key] for key in order]
+        except KeyError:
+            pass
+        # Only the uncached texts are collected for the API, deduplicated in first-seen order.
         deduped: Dict[str, str] = {}
-        order: List[str] = []
-        for text in texts:
-            key = self._hash_text(text)
-            deduped.setdefault(key, text)
-            order.append(key)
-
-        embeddings: Dict[str, List[float]] = {}
-        missing = [key for key in deduped if key not in self._cache]
+        for key, text in zip(order, texts, strict=True):
+            if key not in cache and key not in deduped:
+                deduped[key] = text
+        missing = list(deduped)
 
         if missing:
-            batches = [missing[i : i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)]
-            for batch_keys in batches:
-                batch_texts = [deduped[key] for key in batch_keys]
-                vectors = self._request_embeddings(batch_texts)
-                for key, vector in zip(batch_keys, vectors, strict=True):
-                    self._cache[key] = vector
+            batches = _pack_batches(missing, deduped)
+            if len(batches) == 1 or EMBED_CONCURRENCY <= 1:
+                for batch_keys in batches:
+                    self._store_batch(
+                        batch_keys, self._request_embeddings([deduped[key] for key in batch_keys])
+                    )
+            else:
+                # Requests are latency-bound, so keep several batches in flight at once.
+                workers = min(EMBED_CONCURRENCY, len(batches))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {
+                        pool.submit(
+                            self._request_embeddings, [deduped[key] for key in batch_keys]
+                        ): batch_keys
+                        for batch_keys in batches
+                    }
+                    for future in as_completed(futures):
+                        self._store_batch(futures[future], future.result())
             self._persist_cache()
 
-        for key in order:
-            embeddings[key] = self._cache[key]
-        return [embeddings[key] for key in order]
+        return [cache[key] for key in order]
 
-    def _request_embeddings(self, texts: Iterable[str]) -> List[List[float]]:
+    def _store_batch(self, keys: List[str], vectors: np.ndarray) -> None:
+        with self._lock:
+            for key, vector in zip(keys, vectors, strict=True):
+                self._cache[key] = vector
+            self._dirty_keys.update(keys)
+
+    def _request_embeddings(self, texts: Iterable[str]) -> np.ndarray:
         payload = list(texts)
         max_tokens = self.embed_max_tokens
-        if max_tokens > 0:
-            for item in payload:
-                if estimate_tokens(item) > max_tokens:
-                    raise ValueError("Estimated tokens for embedding input exceed MAX_EMBED_TOKENS")
-        return self.client.embed_texts(payload)
+        # The estimate grows with length, so only the longest input needs checking.
+        if max_tokens > 0 and payload and estimate_tokens(max(payload, key=len)) > max_tokens:
+            raise ValueError("Estimated tokens for embedding input exceed MAX_EMBED_TOKENS")
+        return np.asarray(self.client.embed_texts(payload), dtype=_VECTOR_DTYPE)
 
-    def _load_cache(self) -> Dict[str, List[float]]:
+    def _load_cache(self) -> Dict[str, np.ndarray]:
         if not self.cache_file.exists():
             return {}
         try:
-            with self.cache_file.open("rb") as fh:
-                data = pickle.load(fh)
-            return data if isinstance(data, dict) else {}
-        except Exception:  # pragma: no cover - defensive
+            data = self.cache_file.read_bytes()
+        except OSError:  # pragma: no cover - defensive
+            LOGGER.warning("Unreadable embedding cache %s; starting empty", self.cache_file)
+            return {}
+        if not data.startswith(_CACHE_MAGIC):
+            # Older caches (pickle, EMBC1) are keyed by SHA-256 and cannot be re-keyed.
+            LOGGER.info("Discarding embedding cache %s with an outdated format", self.cache_file)
+            self._needs_rewrite = True
             return {}
+        cache, frames, consumed = _decode_frames(data, len(_CACHE_MAGIC))
+        # Rewrite when a torn tail would corrupt the next append or most frames
+        # are superseded duplicates.
+        self._needs_rewrite = consumed != len(data) or frames > 2 * len(cache)
+        return cache
 
     def _persist_cache(self) -> None:
-        with self.cache_file.open("wb") as fh:
-            pickle.dump(self._cache, fh)
+        """Append frames for entries added since the last persist."""
+        with self._lock:
+            if not self._dirty_keys:
+                return
+            if not self.cache_file.exists():
+                self._dirty_keys.clear()
+                self._write_all()
+                return
+            payload = b"".join(_encode_frame(key, self._cache[key]) for key in self._dirty_keys)
+            self._dirty_keys.clear()
+            with self.cache_file.open("ab") as fh:
+                fh.write(payload)
+
+    def _rewrite_cache(self) -> None:
+        with self._lock:
+            self._dirty_keys.clear()
+            self._write_all()
+        self._needs_rewrite = False
+
+    def _write_all(self) -> None:
+        frames = [_CACHE_MAGIC]
+        frames.extend(_encode_frame(key, vector) for key, vector in self._cache.items())
+        tmp_path = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        tmp_path.write_bytes(b"".join(frames))
+        os.replace(tmp_path, self.cache_file)
 
     @staticmethod
     def _hash_text(text: str) -> str:
-        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+        hasher = _KEY_HASH_TEMPLATE.copy()
+        hasher.update(text.encode("utf-8"))
+        return hasher.hexdigest()
+
+
+def _pack_batches(keys: List[str], texts: Dict[str, str]) -> List[List[str]]:
+    """Greedily fill batches up to ``BATCH_SIZE`` inputs and ``BATCH_TOKENS`` estimated tokens."""
+    batches: List[List[str]] = []
+    batch: List[str] = []
+    batch_tokens = 0
+    for key in keys:
+        tokens = estimate_tokens(texts[key])
+        if batch and (
+            len(batch) >= BATCH_SIZE or (BATCH_TOKENS > 0 and batch_tokens + tokens > BATCH_TOKENS)
+        ):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(key)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _encode_frame(key: str, vector: np.ndarray) -> bytes:
+    key_bytes = key.encode("utf-8")
+    vector_bytes = np.asarray(vector, dtype=_VECTOR_DTYPE).tobytes()
+    return _FRAME_HEADER.pack(len(key_bytes), len(vector_bytes)) + key_bytes + vector_bytes
+
+
+def _decode_frames(data: bytes, offset: int) -> Tuple[Dict[str, np.ndarray], int, int]:
+    """Return ``(cache, frames read, bytes consumed)``; a torn trailing frame is dropped."""
+    cache: Dict[str, np.ndarray] = {}
+    frames = 0
+    view = memoryview(data)
+    end = len(data)
+    while offset + _FRAME_HEADER.size <= end:
+        key_len, vector_len = _FRAME_HEADER.unpack_from(view, offset)
+        body = offset + _FRAME_HEADER.size
+        vector_start = body + key_len
+        if vector_start + vector_len > end:
+            break
+        key = bytes(view[body:vector_start]).decode("utf-8")
+        cache[key] = np.frombuffer(
+            view[vector_start : vector_start + vector_len], dtype=_VECTOR_DTYPE
+        )
+        frames += 1
+        offset = vector_start + vector_len
+    return cache, frames, offset
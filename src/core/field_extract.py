@@ -17,6 +17,22 @@ PREMIUM_AT_INCEPTION_RE = re.compile(
 )
 
 
+# Field name -> pattern whose first group holds the value.
+_FIELD_PATTERNS = {
+    "policy_number": POLICY_NUMBER_RE,
+    "estimated_total_premium": ESTIMATED_TOTAL_PREMIUM_RE,
+    "premium_at_inception": PREMIUM_AT_INCEPTION_RE,
+}
+# One scan for every field. Each alternative is a lookahead so one field's match never
+# consumes text another field needs, keeping results identical to separate searches.
+_COMBINED_FIELD_RE = re.compile(
+    "|".join(f"(?=(?P<{name}>{regex.pattern}))" for name, regex in _FIELD_PATTERNS.items()),
+    re.I | re.S,
+)
+# Each pattern's own value group is numbered right after its named wrapper group.
+_VALUE_GROUPS = {name: index + 1 for name, index in _COMBINED_FIELD_RE.groupindex.items()}
+
+
 def extract_fields(page_or_doc_text: str) -> Dict[str, str]:
     """Extract structured field values from normalized policy text."""
 
@@ -24,17 +40,11 @@ def extract_fields(page_or_doc_text: str) -> Dict[str, str]:
         return {}
 
     fields: Dict[str, str] = {}
-
-    policy_match = POLICY_NUMBER_RE.search(page_or_doc_text)
-    if policy_match:
-        fields["policy_number"] = policy_match.group(1).strip()
-
-    premium_match = ESTIMATED_TOTAL_PREMIUM_RE.search(page_or_doc_text)
-    if premium_match:
-        fields["estimated_total_premium"] = premium_match.group(1).strip()
-
-    inception_match = PREMIUM_AT_INCEPTION_RE.search(page_or_doc_text)
-    if inception_match:
-        fields["premium_at_inception"] = inception_match.group(1).strip()
-
+    for match in _COMBINED_FIELD_RE.finditer(page_or_doc_text):
+        name = match.lastgroup
+        if name is None or name in fields:
+            continue
+        fields[name] = match.group(_VALUE_GROUPS[name]).strip()
+        if len(fields) == len(_FIELD_PATTERNS):
+            break
     return fields
@@ -2,131 +2,240 @@
 
 from __future__ import annotations
 
+import importlib.util
 import logging
+import os
 import re
 import tempfile
-from io import BytesIO
-from typing import Callable, List, Optional, Sequence
+from io import BytesIO, StringIO, TextIOBase
+from typing import TYPE_CHECKING, BinaryIO, List, Optional, Union
 
-from pypdf import PdfReader
+if TYPE_CHECKING:
+    from pypdf import PdfReader
 
-PdfMinerExtractor = Callable[[BytesIO], str]
-
-try:  # pragma: no cover - optional dependency path
-    from pdfminer.high_level import extract_text as pdfminer_extract_text
-except Exception:  # pragma: no cover - guard against optional import errors
-    pdfminer_func: Optional[PdfMinerExtractor] = None
-else:  # pragma: no cover - optional dependency available
-    pdfminer_func = pdfminer_extract_text  # type: ignore[assignment]
+PdfSource = Union[bytes, BinaryIO]
 
 LOGGER = logging.getLogger(__name__)
 
+# Resolved once: extractor availability is checked without importing the (heavy)
+# packages, which are only loaded when a document actually reaches that extractor.
+_HAS_PDFMINER = importlib.util.find_spec("pdfminer") is not None
+_HAS_PYPDFIUM2 = importlib.util.find_spec("pypdfium2") is not None
+_MISSING_OCR_MODULE = next(
+    (name for name in ("ocrmypdf", "pytesseract") if importlib.util.find_spec(name) is None),
+    None,
+)
+# Keep OCR scratch PDFs in RAM-backed tmpfs when available instead of on disk.
+_OCR_TMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+_NORMALIZE_TABLE = str.maketrans("\r\t", "\n ")
+_RUN_RE = re.compile(r"[ ]{3,}|\n{3,}")
+
+
+def _collapse_run(match: re.Match[str]) -> str:
+    return "  " if match.group()[0] == " " else "\n\n"
+
+
+def _normalize_runs(text: str) -> str:
+    # One translate pass for the character swaps, one regex pass for both run collapses.
+    return _RUN_RE.sub(_collapse_run, text.translate(_NORMALIZE_TABLE))
+
 
 def normalize_for_chunking(text: str) -> str:
     """Normalize PDF text while keeping table-friendly spacing."""
 
-    normalized = text.replace("\r", "\n").replace("\t", " ")
-    normalized = re.sub(r"[ ]{3,}", "  ", normalized)
-    normalized = re.sub(r"\n{3,}", "\n\n", normalized)
-    return normalized.strip()
+    return _normalize_runs(text).strip()
 
 
 PAGE_BREAK_SENTINEL = "\f"
 
 
 def extract_text_from_pdf(
-    file_bytes: bytes, *, filename: Optional[str] = None
+    file_bytes: PdfSource, *, filename: Optional[str] = None
 ) -> tuple[str, List[int]]:
-    """Extract normalized text and per-page offsets from PDF bytes."""
+    """Extract normalized text and per-page offsets from PDF bytes or a binary file object.
+
+    File objects (e.g. an upload's spooled temp file) are parsed in place rather than
+    copied into memory first.
+    """
 
-    if not file_bytes:
+    if _is_empty(file_bytes):
         return "", []
 
-    page_texts = _extract_with_pypdf(file_bytes)
-    if page_texts:
-        return _normalize_with_page_breaks(page_texts)
+    page_text = _extract_with_pypdf(file_bytes)
+    # Scanned pages yield no text, so a multi-page scan is just the page separators.
+    if page_text.strip():
+        return _normalize_with_page_breaks(page_text)
 
     LOGGER.warning(
-        "Primary PDF extraction failed; attempting pdfminer fallback for %s",
+        "Primary PDF extraction failed; attempting fallback extractors for %s",
         filename or "unknown file",
     )
+    # PDFium (C++) is several times faster than pdfminer, so it is tried first.
+    pdfium_text = _extract_with_pypdfium2(file_bytes)
+    if pdfium_text.strip():
+        return _normalize_with_page_breaks(pdfium_text)
+
     pdfminer_text = _extract_with_pdfminer(file_bytes)
-    if pdfminer_text:
-        return _normalize_with_page_breaks([pdfminer_text])
+    if pdfminer_text.strip():
+        return _normalize_with_page_breaks(pdfminer_text)
 
     LOGGER.warning(
-        "Both primary PDF extractors failed; attempting OCR fallback for %s",
+        "All text PDF extractors failed; attempting OCR fallback for %s",
         filename or "unknown file",
     )
-    ocr_pages = _extract_with_ocr(file_bytes, filename=filename)
-    if ocr_pages:
-        return _normalize_with_page_breaks(ocr_pages)
+    ocr_text = _extract_with_ocr(_read_all(file_bytes), filename=filename)
+    if ocr_text.strip():
+        return _normalize_with_page_breaks(ocr_text)
 
     return "", []
 
 
-def _extract_with_pypdf(file_bytes: bytes) -> List[str]:
+def _is_empty(source: PdfSource) -> bool:
+    if isinstance(source, (bytes, bytearray)):
+        return not source
+    position = source.seek(0, 2)
+    source.seek(0)
+    return position == 0
+
+
+def _as_stream(source: PdfSource) -> BinaryIO:
+    if isinstance(source, (bytes, bytearray)):
+        return BytesIO(source)
+    source.seek(0)
+    return source
+
+
+def _read_all(source: PdfSource) -> bytes:
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+
+def _extract_with_pypdf(file_bytes: PdfSource) -> str:
+    """Return every page's text in one string, pages separated by ``PAGE_BREAK_SENTINEL``."""
+    from pypdf import PdfReader
+
     try:
-        reader = PdfReader(BytesIO(file_bytes))
+        reader = PdfReader(_as_stream(file_bytes))
     except Exception as exc:  # pragma: no cover - defensive guard
         LOGGER.error("Failed to read PDF with pypdf", exc_info=exc)
-        return []
+        return ""
+
+    return _extract_pages(reader)
 
-    texts = []
-    for page in reader.pages:
+
+def _extract_pages(reader: PdfReader) -> str:
+    buffer = StringIO()
+    pages = reader.pages
+    for index in range(len(pages)):
+        if index:
+            buffer.write(PAGE_BREAK_SENTINEL)
         try:
-            page_text = page.extract_text() or ""
+            buffer.write(pages[index].extract_text() or "")
         except Exception as exc:  # pragma: no cover - defensive guard
             LOGGER.warning("Failed to extract page with pypdf", exc_info=exc)
-            page_text = ""
-        texts.append(page_text)
+    return buffer.getvalue()
 
-    return texts
 
+def _extract_with_pypdfium2(file_bytes: PdfSource) -> str:
+    if not _HAS_PYPDFIUM2:
+        return ""
 
-def _extract_with_pdfminer(file_bytes: bytes) -> str:
-    if pdfminer_func is None:
+    try:
+        import pypdfium2 as pdfium  # type: ignore[import-not-found]
+
+        document = pdfium.PdfDocument(_as_stream(file_bytes))
+    except Exception as exc:  # pragma: no cover - defensive guard
+        LOGGER.error("Failed to read PDF with pypdfium2", exc_info=exc)
+        return ""
+    try:
+        buffer = StringIO()
+        for index in range(len(document)):
+            if index:
+                buffer.write(PAGE_BREAK_SENTINEL)
+            try:
+                page = document[index]
+                # PDFium ends lines with CRLF; keep them single newlines for normalization.
+                buffer.write(page.get_textpage().get_text_range().replace("\r\n", "\n"))
+            except Exception as exc:  # pragma: no cover - defensive guard
+                LOGGER.warning("Failed to extract page with pypdfium2", exc_info=exc)
+        return buffer.getvalue()
+    finally:
+        document.close()
+
+
+def _extract_with_pdfminer(file_bytes: PdfSource) -> str:
+    if not _HAS_PDFMINER:
         return ""
 
+    writer = _PageNormalizingWriter()
     try:
-        return pdfminer_func(BytesIO(file_bytes)) or ""
+        from pdfminer.high_level import extract_text_to_fp
+        from pdfminer.layout import LAParams
+
+        # The writer is a text sink; pdfminer's stubs only admit TextIO/BinaryIO.
+        extract_text_to_fp(
+            _as_stream(file_bytes), writer, laparams=LAParams()  # type: ignore[arg-type]
+        )
+        return writer.getvalue()
     except Exception as exc:  # pragma: no cover - defensive guard
         LOGGER.error("Failed to extract PDF with pdfminer", exc_info=exc)
         return ""
 
 
-def _extract_with_ocr(file_bytes: bytes, *, filename: Optional[str] = None) -> List[str]:
-    """Attempt OCR-based extraction using optional dependencies."""
+class _PageNormalizingWriter(TextIOBase):
+    """Text sink for pdfminer that normalizes each page as soon as its form feed arrives.
 
-    try:  # pragma: no cover - optional dependency path
-        import ocrmypdf  # type: ignore[import-untyped]
-    except Exception:  # pragma: no cover - guard against optional import errors
-        LOGGER.warning(
-            (
-                "OCR dependencies unavailable (missing ocrmypdf); "
-                "install optional extras to enable OCR for %s"
-            ),
-            filename or "unknown file",
-        )
-        return []
+    Runs never span a form feed, so per-page normalization joined and stripped equals
+    ``normalize_for_chunking`` of the whole text, without holding the raw document.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._page: List[str] = []
+        self._parts: List[str] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        *completed, tail = text.split(PAGE_BREAK_SENTINEL)
+        for piece in completed:
+            self._page.append(piece)
+            self._parts.append(_normalize_runs("".join(self._page)))
+            self._parts.append(PAGE_BREAK_SENTINEL)
+            self._page.clear()
+        if tail:
+            self._page.append(tail)
+        return len(text)
+
+    def getvalue(self) -> str:
+        if self._page:
+            self._parts.append(_normalize_runs("".join(self._page)))
+            self._page.clear()
+        return "".join(self._parts).strip()
 
-    try:  # pragma: no cover - optional dependency path
-        import pytesseract  # type: ignore[import-untyped]
-    except Exception:  # pragma: no cover - guard against optional import errors
+
+def _extract_with_ocr(file_bytes: bytes, *, filename: Optional[str] = None) -> str:
+    """Attempt OCR-based extraction using optional dependencies."""
+
+    if _MISSING_OCR_MODULE is not None:
         LOGGER.warning(
-            (
-                "OCR dependencies unavailable (missing pytesseract); "
-                "install optional extras to enable OCR for %s"
-            ),
+            "OCR dependencies unavailable (missing %s); "
+            "install optional extras to enable OCR for %s",
+            _MISSING_OCR_MODULE,
             filename or "unknown file",
         )
-        return []
-    _ = pytesseract  # ensure the import is referenced for linters
+        return ""
+    import ocrmypdf  # type: ignore[import-untyped]  # pragma: no cover - optional dependency
 
+    label = filename or "unknown file"
     try:
         with (
-            tempfile.NamedTemporaryFile(suffix=".pdf") as input_tmp,
-            tempfile.NamedTemporaryFile(suffix=".pdf") as output_tmp,
+            tempfile.NamedTemporaryFile(suffix=".pdf", dir=_OCR_TMP_DIR) as input_tmp,
+            tempfile.NamedTemporaryFile(suffix=".pdf", dir=_OCR_TMP_DIR) as output_tmp,
         ):
             input_tmp.write(file_bytes)
             input_tmp.flush()
@@ -139,51 +248,36 @@ def _extract_with_ocr(file_bytes: bytes, *, filename: Optional[str] = None) -> L
                 force_ocr=True,
             )
 
-            output_tmp.seek(0)
-            ocr_bytes = output_tmp.read()
+            # Reopen by name (the output may have been replaced) and parse it in place.
+            with open(output_tmp.name, "rb") as ocr_output:
+                if _is_empty(ocr_output):
+                    LOGGER.warning("OCR processing produced no output for %s", label)
+                    return ""
+                # Try the extractors again on the OCR-processed PDF.
+                for extractor in (
+                    _extract_with_pypdf,
+                    _extract_with_pypdfium2,
+                    _extract_with_pdfminer,
+                ):
+                    text = extractor(ocr_output)
+                    if text.strip():
+                        return text
+                return ""
     except Exception as exc:  # pragma: no cover - defensive guard
-        LOGGER.error("OCR processing failed for %s", filename or "unknown file", exc_info=exc)
-        return []
-
-    if not ocr_bytes:
-        LOGGER.warning("OCR processing produced no output for %s", filename or "unknown file")
-        return []
-
-    # Try the extractors again on the OCR-processed PDF bytes.
-    page_texts = _extract_with_pypdf(ocr_bytes)
-    if page_texts:
-        return page_texts
-
-    fallback_text = _extract_with_pdfminer(ocr_bytes)
-    return [fallback_text] if fallback_text else []
+        LOGGER.error("OCR processing failed for %s", label, exc_info=exc)
+        return ""
 
 
-def _normalize_with_page_breaks(pages: Sequence[str]) -> tuple[str, List[int]]:
-    if not pages:
+def _normalize_with_page_breaks(text: str) -> tuple[str, List[int]]:
+    """Normalize sentinel-separated page text; return it with each page's start offset."""
+    normalized = normalize_for_chunking(text)
+    if not normalized:
         return "", []
 
-    combined = PAGE_BREAK_SENTINEL.join(pages)
-    normalized = normalize_for_chunking(combined)
-
-    segments = normalized.split(PAGE_BREAK_SENTINEL)
-    parts: list[str] = []
-    page_breaks: list[int] = []
-    offset = 0
-    for index, segment in enumerate(segments):
-        if index > 0:
-            parts.append("\n\n")
-            offset += 2
-        page_breaks.append(offset)
-        parts.append(segment)
-        offset += len(segment)
-
-    raw_text = "".join(parts)
-    trimmed_text = raw_text.strip()
-    if not trimmed_text:
-        return "", []
-
-    leading_trim = len(raw_text) - len(raw_text.lstrip())
-    if leading_trim:
-        page_breaks = [max(0, break_pos - leading_trim) for break_pos in page_breaks]
-
-    return trimmed_text, page_breaks
+    # Each sentinel becomes a blank line, so page ``k`` shifts right by ``k`` characters.
+    page_breaks = [0]
+    position = normalized.find(PAGE_BREAK_SENTINEL)
+    while position != -1:
+        page_breaks.append(position + len(page_breaks) + 1)
+        position = normalized.find(PAGE_BREAK_SENTINEL, position + 1)
+    return normalized.replace(PAGE_BREAK_SENTINEL, "\n\n"), page_breaks
@@ -2,54 +2,83 @@
 
 from __future__ import annotations
 
-from typing import List, Set
+import re
+from typing import Dict, List, Set, Tuple
+
+# Query phrase -> (metadata field, answer label) for the structured-field shortcut.
+STRUCTURED_FIELDS: Dict[str, Tuple[str, str]] = {
+    "estimated total premium": ("estimated_total_premium", "Estimated total premium"),
+    "total premium": ("estimated_total_premium", "Total premium"),
+    "policy number": ("policy_number", "Policy number"),
+    "premium at inception": ("premium_at_inception", "Premium at inception"),
+}
+# Longer phrases win when several appear in one query.
+_PHRASE_RANK = {
+    phrase: rank for rank, phrase in enumerate(sorted(STRUCTURED_FIELDS, key=len, reverse=True))
+}
+# A lookahead match consumes nothing, so overlapping phrases are all found and ranked.
+_STRUCTURED_PHRASE_RE = re.compile(
+    "(?=(" + "|".join(re.escape(phrase) for phrase in _PHRASE_RANK) + "))"
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query_text: str) -> str:
+    """Collapse whitespace and casefold once; reused for phrase matching and cache keys."""
+    return _WHITESPACE_RE.sub(" ", query_text).strip().casefold()
+
+
+def match_structured_phrase(normalized_query: str) -> str | None:
+    """Return the highest-priority structured phrase in the query in one regex scan."""
+    found = {match.group(1) for match in _STRUCTURED_PHRASE_RE.finditer(normalized_query)}
+    if not found:
+        return None
+    return min(found, key=_PHRASE_RANK.__getitem__)
 
 
 def _append_synonyms(existing_terms: List[str], query_lower: str, synonyms: List[str]) -> List[str]:
     additions: List[str] = []
-    existing_lower: Set[str] = {term.lower() for term in existing_terms}
+    seen_lower: Set[str] = {term.lower() for term in existing_terms}
     for synonym in synonyms:
         synonym_lower = synonym.lower()
-        if synonym_lower in query_lower:
-            continue
-        if synonym_lower in existing_lower:
-            continue
-        if synonym_lower in {term.lower() for term in additions}:
+        if synonym_lower in query_lower or synonym_lower in seen_lower:
             continue
         additions.append(synonym)
+        seen_lower.add(synonym_lower)
     return additions
 
 
+# Trigger phrase -> synonyms to append, applied in this order.
+_EXPANSIONS: Dict[str, List[str]] = {
+    "policy number": ["policy #", "policy no", "policy id"],
+    "estimated total premium": ["total premium", "premium total", "premium overall"],
+    "total premium": ["estimated total premium", "premium total", "premium overall"],
+    "premium at inception": ["payable at inception premium", "inception premium"],
+}
+# A trigger is skipped when a more specific trigger containing it was found.
+_SUPERSEDED_BY = {"total premium": "estimated total premium"}
+# One scan reports every trigger, including overlapping ones ("estimated total premium
+# at inception"): the lookahead matches at each position without consuming text.
+_TRIGGER_RE = re.compile(
+    "(?=("
+    + "|".join(re.escape(phrase) for phrase in sorted(_EXPANSIONS, key=len, reverse=True))
+    + "))"
+)
+
+
 def expand_query(query: str) -> str:
     """Append common synonyms to improve recall for structured fields."""
 
     lowered = query.lower()
-    appended: List[str] = []
+    found = {match.group(1) for match in _TRIGGER_RE.finditer(lowered)}
+    if not found:
+        return query
 
-    if "policy number" in lowered:
-        appended.extend(_append_synonyms(appended, lowered, ["policy #", "policy no", "policy id"]))
-    if "estimated total premium" in lowered:
-        appended.extend(
-            _append_synonyms(
-                appended,
-                lowered,
-                ["total premium", "premium total", "premium overall"],
-            )
-        )
-    elif "total premium" in lowered:
-        appended.extend(
-            _append_synonyms(
-                appended,
-                lowered,
-                ["estimated total premium", "premium total", "premium overall"],
-            )
-        )
-    if "premium at inception" in lowered:
-        appended.extend(
-            _append_synonyms(
-                appended, lowered, ["payable at inception premium", "inception premium"]
-            )
-        )
+    appended: List[str] = []
+    for phrase, synonyms in _EXPANSIONS.items():
+        if phrase not in found or _SUPERSEDED_BY.get(phrase) in found:
+            continue
+        appended.extend(_append_synonyms(appended, lowered, synonyms))
 
     if not appended:
         return query
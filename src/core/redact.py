@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import os
 import re
 from typing import Pattern
@@ -23,17 +24,32 @@ REDACTION_TOKENS = {
     "address": "[REDACTED_ADDRESS]",
 }
 
+# Patterns run in priority order, each over the previous pass's output, so an earlier
+# pattern claims overlapping text first. A pass is skipped when its text lacks a character
+# every match needs; prose without "@" or digits is returned untouched.
+_AT_RE = re.compile("@")
+_DIGIT_RE = re.compile(r"\d")
+_PASSES = tuple(
+    (pattern, REDACTION_TOKENS[key], _AT_RE if key == "email" else _DIGIT_RE)
+    for key, pattern in REDACTION_PATTERNS.items()
+)
+
+
+@functools.cache
+def _env_default_enabled() -> bool:
+    """Resolve ``REDACT_PII`` once; retrieval calls ``redact_text`` for every hit."""
+    return os.getenv("REDACT_PII", "true").lower() in {"1", "true", "yes"}
+
 
 def redact_text(value: str, *, enabled: bool | None = None) -> str:
     """Redact PII from text if enabled."""
     if enabled is None:
-        enabled = os.getenv("REDACT_PII", "true").lower() in {"1", "true", "yes"}
+        enabled = _env_default_enabled()
 
     if not enabled or not value:
         return value
 
-    redacted = value
-    for key, pattern in REDACTION_PATTERNS.items():
-        token = REDACTION_TOKENS[key]
-        redacted = pattern.sub(token, redacted)
-    return redacted
+    for pattern, token, required in _PASSES:
+        if required.search(value) is not None:
+            value = pattern.sub(token, value)
+    return value
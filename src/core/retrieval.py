@@ -4,8 +4,9 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
+import numpy as np
 from dotenv import load_dotenv
 
 from ..core.chunk import format_page_label
@@ -17,7 +18,7 @@ load_dotenv()
 DEFAULT_TOP_K = int(os.getenv("TOP_K", "3"))
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievedChunk:
     score: float
     chunk_id: str
@@ -26,6 +27,32 @@ class RetrievedChunk:
     metadata: Metadata
 
 
+@dataclass(slots=True)
+class RetrievedBatch:
+    """Search results stored column-wise; iterating yields ``RetrievedChunk`` views."""
+
+    scores: np.ndarray
+    chunk_ids: List[str]
+    texts: List[str]
+    sources: List[str]
+    metadatas: List[Metadata]
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def __getitem__(self, index: int) -> RetrievedChunk:
+        return RetrievedChunk(
+            score=float(self.scores[index]),
+            chunk_id=self.chunk_ids[index],
+            text=self.texts[index],
+            source=self.sources[index],
+            metadata=self.metadatas[index],
+        )
+
+    def __iter__(self) -> Iterator[RetrievedChunk]:
+        return (self[index] for index in range(len(self)))
+
+
 class Retriever:
     def __init__(self, store: FaissVectorStore) -> None:
         self.store = store
@@ -36,29 +63,42 @@ class Retriever:
         *,
         top_k: int | None = None,
         redact: bool | None = None,
-    ) -> List[RetrievedChunk]:
+    ) -> RetrievedBatch:
         k = top_k or DEFAULT_TOP_K
         results = self.store.search(query_embedding, k)
-        chunks: List[RetrievedChunk] = []
-        for score, meta in results:
-            text = redact_text(meta.text, enabled=redact)
-            chunks.append(
-                RetrievedChunk(
-                    score=score,
-                    chunk_id=meta.chunk_id,
-                    text=text,
-                    source=meta.source,
-                    metadata=meta,
-                )
+        metadatas = [meta for _score, meta in results]
+        return RetrievedBatch(
+            scores=np.fromiter((score for score, _meta in results), dtype=np.float32),
+            chunk_ids=[meta.chunk_id for meta in metadatas],
+            texts=[redact_text(meta.text, enabled=redact) for meta in metadatas],
+            sources=[meta.source for meta in metadatas],
+            metadatas=metadatas,
+        )
+
+    def build_context(self, chunks: RetrievedBatch | Iterable[RetrievedChunk]) -> List[str]:
+        if not isinstance(chunks, RetrievedBatch):
+            items = list(chunks)
+            chunks = RetrievedBatch(
+                scores=np.array([chunk.score for chunk in items], dtype=np.float32),
+                chunk_ids=[chunk.chunk_id for chunk in items],
+                texts=[chunk.text for chunk in items],
+                sources=[chunk.source for chunk in items],
+                metadatas=[chunk.metadata for chunk in items],
+            )
+        return [
+            f"Source: {source} | Chunk: {chunk_id}"
+            + (f" | {label}" if (label := _page_label(meta)) else "")
+            + f"\nScore: {score:.4f}\n{text}"
+            for source, chunk_id, meta, score, text in zip(
+                chunks.sources,
+                chunks.chunk_ids,
+                chunks.metadatas,
+                chunks.scores.tolist(),
+                chunks.texts,
+                strict=True,
             )
-        return chunks
-
-    def build_context(self, chunks: Iterable[RetrievedChunk]) -> List[str]:
-        context_blocks = []
-        for chunk in chunks:
-            page_label = format_page_label(chunk.metadata.page_start, chunk.metadata.page_end)
-            header = f"Source: {chunk.source} | Chunk: {chunk.chunk_id}"
-            if page_label:
-                header += f" | {page_label}"
-            context_blocks.append(f"{header}\nScore: {chunk.score:.4f}\n{chunk.text}")
-        return context_blocks
+        ]
+
+
+def _page_label(meta: Metadata) -> str:
+    return meta.page_label or format_page_label(meta.page_start, meta.page_end)
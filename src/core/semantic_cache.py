@@ -0,0 +1,111 @@
+"""Answer cache keyed by query-embedding similarity."""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Sequence, Tuple
+
+import faiss  # type: ignore
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_SIZE", "1024"))
+
+
+class SemanticCache:
+    """Return a stored answer when a new query embedding is close to a cached one."""
+
+    def __init__(self, *, threshold: float | None = None, max_entries: int | None = None) -> None:
+        self.threshold = DEFAULT_THRESHOLD if threshold is None else threshold
+        self.max_entries = DEFAULT_MAX_ENTRIES if max_entries is None else max_entries
+        self._lock = threading.Lock()
+        # Vectors are stored under monotonically increasing ids so the oldest entry can be
+        # evicted on its own once the cache is full.
+        self._index: faiss.IndexIDMap | None = None
+        self._entries: OrderedDict[int, Tuple[Hashable, Any, str | None]] = OrderedDict()
+        self._by_text: Dict[Tuple[Hashable, str], int] = {}
+        self._next_id = 0
+
+    def lookup(
+        self, embedding: Sequence[float] | np.ndarray, *, key: Hashable = None
+    ) -> Any | None:
+        """Return the cached value for the closest query with the same ``key``."""
+        if self.max_entries <= 0:
+            return None
+        vector = _normalized(embedding)
+        with self._lock:
+            if self._index is None or not self._entries:
+                return None
+            if vector.shape[1] != self._index.d:
+                return None
+            scores, ids = self._index.search(vector, min(4, len(self._entries)))
+            for score, entry_id in zip(scores[0], ids[0].tolist(), strict=True):
+                if entry_id == -1 or score < self.threshold:
+                    break
+                entry_key, value, _text = self._entries[entry_id]
+                if entry_key == key:
+                    return value
+        return None
+
+    def lookup_text(self, text: str, *, key: Hashable = None) -> Any | None:
+        """Return the cached value for an exact (normalized) query text, skipping embedding."""
+        with self._lock:
+            entry_id = self._by_text.get((key, text))
+            return None if entry_id is None else self._entries[entry_id][1]
+
+    def store(
+        self,
+        embedding: Sequence[float] | np.ndarray,
+        value: Any,
+        *,
+        key: Hashable = None,
+        text: str | None = None,
+    ) -> None:
+        """Remember ``value`` for the query embedding (and exact ``text`` if given).
+
+        When the cache is full the oldest entry is evicted; the rest stay cached.
+        """
+        if self.max_entries <= 0:
+            return
+        vector = _normalized(embedding)
+        with self._lock:
+            index = self._index
+            if index is None:
+                index = self._index = faiss.IndexIDMap(faiss.IndexFlatIP(vector.shape[1]))
+            if vector.shape[1] != index.d:
+                return
+            while len(self._entries) >= self.max_entries:
+                self._evict_oldest(index)
+            entry_id = self._next_id
+            self._next_id += 1
+            index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+            if text is not None:
+                self._by_text[(key, text)] = entry_id
+            self._entries[entry_id] = (key, value, text)
+
+    def _evict_oldest(self, index: faiss.IndexIDMap) -> None:
+        entry_id, (key, _value, text) = self._entries.popitem(last=False)
+        index.remove_ids(np.array([entry_id], dtype=np.int64))  # type: ignore[arg-type]
+        if text is not None and self._by_text.get((key, text)) == entry_id:
+            del self._by_text[(key, text)]
+
+    def clear(self) -> None:
+        """Drop every cached answer (e.g. after the corpus changes)."""
+        with self._lock:
+            self._index = None
+            self._entries = OrderedDict()
+            self._by_text = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _normalized(embedding: Sequence[float] | np.ndarray) -> np.ndarray:
+    vector = np.array([embedding], dtype="float32")
+    faiss.normalize_L2(vector)
+    return vector
@@ -7,6 +7,9 @@ from .schema import (
     Marker,
     QueryEvent,
     RetrievalHit,
+    make_ingest_event,
+    make_query_event,
+    make_retrieval_hit,
     run_id,
     tz_now,
 )
@@ -18,6 +21,9 @@ __all__ = [
     "Marker",
     "QueryEvent",
     "RetrievalHit",
+    "make_ingest_event",
+    "make_query_event",
+    "make_retrieval_hit",
     "run_id",
     "tz_now",
 ]
@@ -0,0 +1,42 @@
+"""JSON line serialization for ledger records."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Mapping
+
+from pydantic import BaseModel
+
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore[import-not-found]
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+
+def _model_fields(obj: Any) -> Any:
+    # Event models hold only JSON-native values and nested models, so their field dict
+    # serializes as-is; no intermediate ``model_dump()`` dicts are built.
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_line(obj: Mapping[str, Any]) -> bytes:
+    """Serialize ``obj`` as one UTF-8 JSON line (orjson when available)."""
+    if orjson is not None:
+        # orjson only accepts real dicts; event dumps already are, so avoid copying them.
+        payload = obj if type(obj) is dict else dict(obj)
+        return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def dump_event(event: Mapping[str, Any] | BaseModel) -> bytes:
+    """Serialize a ledger record (mapping or event model) as one UTF-8 JSON line."""
+    if not isinstance(event, BaseModel):
+        return dumps_line(event)
+    if orjson is not None:
+        return orjson.dumps(event, default=_model_fields, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(event, default=_model_fields, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+__all__ = ["dump_event", "dumps_line"]
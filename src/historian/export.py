@@ -3,8 +3,20 @@
 from __future__ import annotations
 
 import json
+import mmap
+import re
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set
+
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore[import-not-found]
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+# Both parsers accept raw UTF-8 bytes, so lines are never decoded to str first.
+_loads: Callable[[bytes], Any] = orjson.loads if orjson is not None else json.loads
+
+SAMPLE_QUERIES = 10
 
 
 def load_ledger(path: str | Path) -> Iterable[dict]:
@@ -14,42 +26,89 @@ def load_ledger(path: str | Path) -> Iterable[dict]:
         return []
 
     def _generator() -> Iterator[dict]:
-        with ledger_path.open("r", encoding="utf-8") as handle:
+        loads = _loads
+        with ledger_path.open("rb") as handle:
             for line in handle:
-                line = line.strip()
-                if not line:
+                if line.isspace():
                     continue
-                yield json.loads(line)
+                yield loads(line)
 
     return _generator()
 
 
+# Events are written with ``kind`` as their first key, so it can be read from the line
+# prefix without parsing the (potentially large) rest of the object.
+_KIND_PREFIX_RE = re.compile(rb'\s*\{\s*"kind"\s*:\s*"([a-z_]+)"')
+
+
 def summarize(path: str | Path) -> Dict[str, object]:
-    """Summarize the ledger contents for quick inspection."""
+    """Summarize the ledger contents for quick inspection.
+
+    One pass over the memory-mapped file keeps only two counters, the set of ingested
+    filenames and the first ``SAMPLE_QUERIES`` queries; no list of events is built.
+    """
     ingest_events = 0
     query_events = 0
-    files = set()
+    files: Set[str] = set()
     sample_queries: List[dict] = []
 
-    for entry in load_ledger(path):
-        kind = entry.get("kind")
-        if kind == "ingest":
-            ingest_events += 1
-            filename = entry.get("filename")
-            if isinstance(filename, str):
-                files.add(filename)
-        elif kind == "query":
-            query_events += 1
-            if len(sample_queries) < 10:
-                sample_queries.append(
-                    {
-                        "query": entry.get("query"),
-                        "ts": entry.get("ts"),
-                        "top_k": entry.get("top_k"),
-                        "hits": len(entry.get("hits") or []),
-                    }
-                )
+    ledger_path = Path(path)
+    if not ledger_path.exists() or not ledger_path.stat().st_size:
+        return _summary(ingest_events, query_events, files, sample_queries)
+
+    loads = _loads
+    match_kind = _KIND_PREFIX_RE.match
+    with (
+        ledger_path.open("rb") as handle,
+        mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as ledger,
+    ):
+        # Lines are located with memchr-style finds over the mapping; a line is only
+        # copied out of it when it has to be parsed.
+        find = ledger.find
+        size = len(ledger)
+        position = 0
+        while position < size:
+            line_end = find(b"\n", position)
+            if line_end == -1:
+                line_end = size
+            line_start, position = position, line_end + 1
+            prefix = match_kind(ledger, line_start, line_end)
+            if (
+                prefix is not None
+                and prefix.group(1) == b"query"
+                and len(sample_queries) >= SAMPLE_QUERIES
+            ):
+                # Past the samples only the count matters; skip parsing the hits payload.
+                query_events += 1
+                continue
+            line = ledger[line_start:line_end]
+            if not line or line.isspace():
+                continue
+            entry = loads(line)
+            kind = entry.get("kind")
+            if kind == "ingest":
+                ingest_events += 1
+                filename = entry.get("filename")
+                if isinstance(filename, str):
+                    files.add(filename)
+            elif kind == "query":
+                query_events += 1
+                if len(sample_queries) < SAMPLE_QUERIES:
+                    sample_queries.append(
+                        {
+                            "query": entry.get("query"),
+                            "ts": entry.get("ts"),
+                            "top_k": entry.get("top_k"),
+                            "hits": len(entry.get("hits") or []),
+                        }
+                    )
+
+    return _summary(ingest_events, query_events, files, sample_queries)
+
 
+def _summary(
+    ingest_events: int, query_events: int, files: Set[str], sample_queries: List[dict]
+) -> Dict[str, object]:
     return {
         "ingest_events": ingest_events,
         "files": sorted(files),
@@ -2,14 +2,31 @@
 
 from __future__ import annotations
 
-import json
+import atexit
+import os
+import threading
+import weakref
 from pathlib import Path
-from typing import Any, Mapping
+from types import TracebackType
+from typing import Any, BinaryIO, Iterable, Mapping
 
+from pydantic import BaseModel
+
+from ._serialize import dump_event, dumps_line
 from .schema import LedgerConfig
 
 _BYTES_IN_MB = 1024 * 1024
 
+# Ledgers still alive at exit get their buffered events written; held weakly so that
+# discarded ledgers (reloads, tests) are collected and their files closed.
+_LIVE_LEDGERS: weakref.WeakSet[Ledger] = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_ledgers() -> None:
+    for ledger in list(_LIVE_LEDGERS):
+        ledger.close()
+
 
 class Ledger:
     """Manage an append-only JSONL ledger."""
@@ -18,34 +35,115 @@ class Ledger:
         self.cfg = cfg or LedgerConfig()
         self.path = Path(self.cfg.path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Opened lazily and kept across appends; its size is tracked from the bytes written.
+        self._handle: BinaryIO | None = None
+        self._size = 0
+        _LIVE_LEDGERS.add(self)
+
+    def __enter__(self) -> "Ledger":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _open(self) -> BinaryIO:
+        if self._handle is None:
+            # By default (buffer_kb=0) each serialized line is handed to one write() as is;
+            # copying it into a reused bytearray first would only add a memcpy, since the
+            # serializer returns fresh bytes either way. With buffer_kb>0, appends collect in
+            # the handle's own buffer until it fills, on flush()/close(), or before rotation.
+            self._handle = self.path.open("ab", buffering=max(self.cfg.buffer_kb, 0) * 1024)
+            self._size = self._handle.seek(0, os.SEEK_END)
+        return self._handle
+
+    def _refresh_size(self) -> None:
+        """Re-read the size from disk, reopening if the path now names another file.
 
-    def _rotate(self) -> None:
-        """Rotate the ledger file when the size exceeds the configured limit."""
-        if not self.path.exists():
+        Other writers (API workers, ``Hist-Clear``) may rotate, delete or truncate the ledger
+        behind the open handle; this is only checked when the tracked size calls for rotation.
+        """
+        handle = self._open()
+        try:
+            on_disk = os.stat(self.path)
+        except FileNotFoundError:
+            on_disk = None
+        if on_disk is None or not os.path.samestat(on_disk, os.fstat(handle.fileno())):
+            self._close()
+            self._open()
             return
+        raw = getattr(handle, "raw", None)
+        buffered = handle.tell() - raw.tell() if raw is not None else 0
+        self._size = on_disk.st_size + buffered
 
+    def _rotate(self, incoming: int) -> None:
+        """Rotate the ledger file before ``incoming`` bytes would push it past the limit."""
         max_bytes = self.cfg.rotate_mb * _BYTES_IN_MB
-        if max_bytes <= 0:
+        # A record larger than the limit still goes into a fresh file rather than rotating
+        # an empty one.
+        if max_bytes <= 0 or self._size == 0 or self._size + incoming <= max_bytes:
             return
-
-        current_size = self.path.stat().st_size
-        if current_size < max_bytes:
+        self._refresh_size()
+        if self._size == 0 or self._size + incoming <= max_bytes:
             return
 
+        self._close()
         index = 1
         while True:
             rotated = self.path.with_name(f"{self.path.stem}.r{index}{self.path.suffix}")
             if not rotated.exists():
-                self.path.rename(rotated)
+                try:
+                    self.path.rename(rotated)
+                except FileNotFoundError:
+                    pass  # another process rotated it first
                 break
             index += 1
 
-    def append(self, obj: Mapping[str, Any]) -> None:
-        """Append a JSON serializable mapping to the ledger."""
-        self._rotate()
-        with self.path.open("a", encoding="utf-8") as handle:
-            json.dump(obj, handle, ensure_ascii=False)
-            handle.write("\n")
+    def append(self, obj: Mapping[str, Any] | BaseModel) -> None:
+        """Append a JSON serializable mapping or event model to the ledger."""
+        self._write(dump_event(obj))
+
+    def append_many(self, objs: Iterable[Mapping[str, Any]]) -> None:
+        """Append several mappings, framed into one buffer and written with one call."""
+        payload = b"".join(map(dumps_line, objs))
+        if payload:
+            self._write(payload)
+
+    def append_raw(self, raw: bytes) -> None:
+        """Append one already-serialized JSON object without re-encoding it.
+
+        ``raw`` must be a single line of UTF-8 JSON; a trailing newline is added if missing.
+        """
+        self._write(raw if raw.endswith(b"\n") else raw + b"\n")
+
+    def _write(self, payload: bytes) -> None:
+        with self._lock:
+            self._open()  # loads the current size on first use
+            self._rotate(len(payload))
+            handle = self._open()  # reopened if rotation closed it
+            self._size += handle.write(payload) or 0
+
+    def flush(self) -> None:
+        """Write buffered events to the ledger file."""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+
+    def close(self) -> None:
+        """Flush and close the open ledger handle; the next append reopens it."""
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._size = 0
 
 
-__all__ = ["Ledger"]
+__all__ = ["Ledger", "dumps_line"]
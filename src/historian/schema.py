@@ -3,15 +3,20 @@
 from __future__ import annotations
 
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Sequence, Tuple
 from uuid import uuid4
-from zoneinfo import ZoneInfo
 
 from pydantic import BaseModel, Field
 
-_PHX_ZONE = ZoneInfo("America/Phoenix")
+# America/Phoenix does not observe DST, so a fixed UTC-7 offset matches the IANA zone
+# without its per-call lookup.
+_PHX_OFFSET = timezone(timedelta(hours=-7))
+# (epoch second, formatted date/time for that second); events arrive in bursts, so the
+# strftime runs at most once per second and only the microseconds are formatted per call.
+_SECOND_PREFIX: Tuple[int, str] = (-1, "")
 
 
 def run_id() -> str:
@@ -21,7 +26,13 @@ def run_id() -> str:
 
 def tz_now() -> str:
     """Return the current timestamp in the Phoenix timezone."""
-    return datetime.now(_PHX_ZONE).isoformat()
+    global _SECOND_PREFIX
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_second, prefix = _SECOND_PREFIX
+    if cached_second != seconds:
+        prefix = datetime.fromtimestamp(seconds, _PHX_OFFSET).strftime("%Y-%m-%dT%H:%M:%S")
+        _SECOND_PREFIX = (seconds, prefix)
+    return f"{prefix}.{nanos // 1000:06d}-07:00"
 
 
 class Marker(BaseModel):
@@ -75,6 +86,100 @@ class QueryEvent(BaseModel):
     markers: list[Marker] = Field(default_factory=list)
 
 
+# The ledger is write-only, so the hot paths below build event dicts directly: same keys,
+# order and defaults as ``model_dump()`` of the models above, without field validation.
+
+
+def make_ingest_event(
+    *,
+    filename: str,
+    chunks: int,
+    embed_batches: int,
+    duration_ms: int,
+    markers: Sequence[Marker] = (),
+) -> Dict[str, Any]:
+    """Return an ``IngestEvent`` ledger record as a plain dict."""
+    return {
+        "kind": "ingest",
+        "ts": tz_now(),
+        "run": run_id(),
+        "filename": filename,
+        "chunks": chunks,
+        "embed_batches": embed_batches,
+        "duration_ms": duration_ms,
+        "markers": [{"type": marker.type, "text": marker.text} for marker in markers],
+    }
+
+
+def make_retrieval_hit(
+    *,
+    source: str,
+    chunk_id: str,
+    score: float,
+    preview: str,
+    page_start: int | None = None,
+    page_end: int | None = None,
+) -> Dict[str, Any]:
+    """Return a ``RetrievalHit`` ledger record as a plain dict."""
+    return {
+        "source": source,
+        "chunk_id": chunk_id,
+        "score": score,
+        "preview": preview,
+        "page_start": page_start,
+        "page_end": page_end,
+    }
+
+
+def _hit_record(hit: RetrievalHit | Dict[str, Any]) -> Dict[str, Any]:
+    if isinstance(hit, dict):
+        return hit
+    return make_retrieval_hit(
+        source=hit.source,
+        chunk_id=hit.chunk_id,
+        score=hit.score,
+        preview=hit.preview,
+        page_start=hit.page_start,
+        page_end=hit.page_end,
+    )
+
+
+def make_query_event(
+    *,
+    query: str,
+    top_k: int,
+    hits: Sequence[RetrievalHit | Dict[str, Any]],
+    model: str,
+    max_tokens: int,
+    temperature: float,
+    latency_ms: int,
+    answer_chars: int,
+    est_input_tokens: Optional[int] = None,
+    est_output_tokens: Optional[int] = None,
+    est_usd: Optional[float] = None,
+    markers: Sequence[Marker] = (),
+) -> Dict[str, Any]:
+    """Return a ``QueryEvent`` ledger record as a plain dict."""
+    return {
+        "kind": "query",
+        "ts": tz_now(),
+        "run": run_id(),
+        "query": query,
+        "top_k": top_k,
+        # Hit dicts from ``make_retrieval_hit`` are embedded as-is.
+        "hits": [_hit_record(hit) for hit in hits],
+        "model": model,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "latency_ms": latency_ms,
+        "answer_chars": answer_chars,
+        "est_input_tokens": est_input_tokens,
+        "est_output_tokens": est_output_tokens,
+        "est_usd": est_usd,
+        "markers": [{"type": marker.type, "text": marker.text} for marker in markers],
+    }
+
+
 def _ledger_path_from_env() -> Path:
     value = os.getenv("HIST_LEDGER", "data/historian/ledger.jsonl")
     return Path(value)
@@ -88,11 +193,21 @@ def _rotate_mb_from_env() -> int:
         return 10
 
 
+def _buffer_kb_from_env() -> int:
+    value = os.getenv("HIST_BUFFER_KB", "0")
+    try:
+        return int(value)
+    except ValueError:  # pragma: no cover - defensive guard
+        return 0
+
+
 class LedgerConfig(BaseModel):
     """Runtime configuration for the ledger."""
 
     path: Path = Field(default_factory=_ledger_path_from_env)
     rotate_mb: int = Field(default_factory=_rotate_mb_from_env)
+    # 0 writes each event immediately; batch callers may opt into an in-memory buffer.
+    buffer_kb: int = Field(default_factory=_buffer_kb_from_env)
 
 
 __all__ = [
@@ -101,6 +216,9 @@ __all__ = [
     "Marker",
     "QueryEvent",
     "RetrievalHit",
+    "make_ingest_event",
+    "make_query_event",
+    "make_retrieval_hit",
     "run_id",
     "tz_now",
 ]
@@ -2,17 +2,22 @@
 
 from __future__ import annotations
 
+import base64
+import functools
 import logging
 import os
 import time
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
 
+import numpy as np
 from dotenv import load_dotenv
-from openai import APIError, OpenAI, OpenAIError
 
 from ..core.cost_guard import CostGuard, exponential_backoff
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 LOGGER = logging.getLogger(__name__)
 
 load_dotenv()
@@ -20,6 +25,7 @@ load_dotenv()
 DEFAULT_CHAT_MODEL = os.getenv("CHAT_MODEL", "gpt-4o-mini")
 FALLBACK_CHAT_MODEL = "gpt-4o-mini-2024-07-18"
 EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-3-small")
+MAX_ATTEMPTS = 5
 
 SYSTEM_PROMPT = (
     "Answer strictly from provided context; if unknown, say you don't know; "
@@ -27,28 +33,72 @@ SYSTEM_PROMPT = (
 )
 
 
+def _embedding_matrix(items: Sequence[Any]) -> np.ndarray:
+    """Decode embedding payloads (base64 float32 or float lists) into one float32 matrix."""
+    rows = [
+        (
+            np.frombuffer(base64.b64decode(item.embedding), dtype="<f4")
+            if isinstance(item.embedding, str)
+            else item.embedding
+        )
+        for item in items
+    ]
+    if not rows:
+        return np.empty((0, 0), dtype=np.float32)
+    matrix = np.empty((len(rows), len(rows[0])), dtype=np.float32)
+    for index, row in enumerate(rows):
+        matrix[index] = row
+    return matrix
+
+
 class OpenAIClient:
     def __init__(self, *, api_key: str | None = None) -> None:
         api_key = api_key or os.getenv("OPENAI_API_KEY", "")
         if not api_key:
             LOGGER.warning("OPENAI_API_KEY missing; client will fail on live calls")
+        # The SDK takes ~0.4 s to import; defer it until a client is actually built.
+        from openai import OpenAI
+
         http_client = self._build_http_client()
-        self.client = OpenAI(api_key=api_key, http_client=http_client)
-        self.cost_guard = CostGuard.from_env()
+        self.client: OpenAI = OpenAI(api_key=api_key, http_client=http_client)
+        self.cost_guard = CostGuard.shared()
+
+    @classmethod
+    def shared(cls, *, api_key: str | None = None) -> "OpenAIClient":
+        """Process-wide client per API key, built on first use.
+
+        The SDK keeps a keep-alive connection pool per client, so sharing one instance
+        between embeddings and chat reuses TCP/TLS sessions instead of opening new ones.
+        The key is resolved from the environment per call, so a changed key gets a new
+        client.
+        """
+        return _shared_client(api_key or os.getenv("OPENAI_API_KEY", ""))
+
+    @classmethod
+    def reset_shared(cls) -> None:
+        """Forget every shared client (tests, module reloads); new ones are built on demand."""
+        _shared_client.cache_clear()
+
+    def embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """Return one float32 row per input text."""
+        from openai import OpenAIError
 
-    def embed_texts(self, texts: Sequence[str]) -> List[List[float]]:
         if not texts:
-            return []
+            return np.empty((0, 0), dtype=np.float32)
         model = EMBED_MODEL
         retries = exponential_backoff()
         last_error: OpenAIError | None = None
-        for attempt in range(5):
+        for attempt in range(MAX_ATTEMPTS):
             try:
-                response = self.client.embeddings.create(model=model, input=list(texts))
-                return [list(item.embedding) for item in response.data]
+                # Ask for base64 explicitly: the SDK then hands back the raw float32 bytes
+                # instead of expanding them into lists of Python floats.
+                response = self.client.embeddings.create(
+                    model=model, input=list(texts), encoding_format="base64"
+                )
+                return _embedding_matrix(response.data)
             except OpenAIError as exc:  # pragma: no cover - network path
                 last_error = exc
-                if attempt == 4:
+                if attempt == MAX_ATTEMPTS - 1:
                     break
                 wait = next(retries)
                 LOGGER.warning(
@@ -61,11 +111,13 @@ class OpenAIClient:
         raise RuntimeError("Failed to retrieve embeddings after retries")
 
     def chat(self, *, query: str, context_blocks: Iterable[str]) -> str:
+        from openai import APIError
+
         model = DEFAULT_CHAT_MODEL or FALLBACK_CHAT_MODEL
         prompt = self._build_prompt(context_blocks)
         self.cost_guard.enforce_budget(prompt=prompt, completion=query)
         retries = exponential_backoff()
-        for attempt in range(5):
+        for attempt in range(MAX_ATTEMPTS):
             try:
                 response = self.client.chat.completions.create(
                     model=model,
@@ -83,6 +135,8 @@ class OpenAIClient:
                 return message
             except APIError as exc:  # pragma: no cover - network path
                 self.cost_guard.after_failure(error=exc)
+                if attempt == MAX_ATTEMPTS - 1:
+                    break
                 wait = next(retries)
                 LOGGER.warning(
                     "Chat request failed; retrying",
@@ -124,3 +178,8 @@ class OpenAIClient:
         LOGGER.info("Using custom CA bundle for OpenAI client", extra={"path": str(path)})
         # httpx.Client accepts str paths for verify parameter.
         return httpx.Client(verify=str(path))
+
+
+@functools.cache
+def _shared_client(api_key: str) -> OpenAIClient:
+    return OpenAIClient(api_key=api_key)
@@ -2,21 +2,68 @@
 
 from __future__ import annotations
 
+import atexit
+import json
+import logging
+import math
+import mmap
 import os
 import pickle
+import threading
+import time
+import weakref
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from typing import Any, Callable, Dict, Iterable, List, Sequence
 
 import faiss  # type: ignore
 import numpy as np
 from dotenv import load_dotenv
 
+from ..core.chunk import format_page_label
+
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore[import-not-found]
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+LOGGER = logging.getLogger(__name__)
+
 load_dotenv()
 
+_dumps: Callable[[Any], bytes] = (
+    orjson.dumps
+    if orjson is not None
+    else lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+)
+_loads: Callable[[bytes], Any] = orjson.loads if orjson is not None else json.loads
+
 DATA_DIR = Path(os.getenv("DATA_DIR", "data"))
 INDEX_PATH = DATA_DIR / "index.faiss"
-META_PATH = DATA_DIR / "meta.pkl"
+# One JSON object per metadata row; rows are appended as they are persisted.
+META_PATH = DATA_DIR / "meta.jsonl"
+# add() writes to disk once this many rows are pending or this many seconds have passed
+# since the last write; flush() (called per ingest request and at exit) persists the rest.
+PERSIST_EVERY = int(os.getenv("FAISS_PERSIST_EVERY", "1000"))
+PERSIST_INTERVAL = float(os.getenv("FAISS_PERSIST_INTERVAL", "10"))
+# With the IVF/HNSW rebuild disabled, a flat index holding this many vectors is rebuilt as an
+# int8 IndexScalarQuantizer, 4x smaller than float32 (0 keeps it exact). Its per-dimension
+# ranges are trained once, so the sample must be large enough that later vectors fit them.
+SQ_TRAIN_SIZE = int(os.getenv("FAISS_SQ_TRAIN_SIZE", "20000"))
+# Once the corpus holds this many vectors the flat index is rebuilt as IVF (0 disables).
+IVF_THRESHOLD = int(os.getenv("FAISS_IVF_THRESHOLD", "20000"))
+IVF_NPROBE = int(os.getenv("FAISS_NPROBE", "0"))
+# Per-vector encoding used by the IVF index: SQ8 (int8, 4x smaller), SQfp16, Flat or PQ<m>.
+IVF_CODEC = os.getenv("FAISS_IVF_CODEC", "SQ8")
+# Index built past the threshold: "ivf" (quantized inverted lists) or "hnsw" (graph).
+ANN_KIND = os.getenv("FAISS_ANN", "ivf").lower()
+HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("FAISS_HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
+# OpenMP threads FAISS may use to search a batch of queries in parallel (0 keeps its default).
+OMP_THREADS = int(os.getenv("FAISS_OMP_THREADS", "0"))
+if OMP_THREADS > 0:
+    faiss.omp_set_num_threads(OMP_THREADS)
 
 
 @dataclass
@@ -28,61 +75,388 @@ class Metadata:
     page_start: int | None = None
     page_end: int | None = None
     fields: Dict[str, str] = field(default_factory=dict)
+    content_hash: str | None = None
+    # Formatted once when the row is stored; empty for rows persisted before labels were.
+    page_label: str = ""
+
+
+# Stores still alive at exit get their pending rows flushed; held weakly so that
+# discarded stores (reloads, tests) can be garbage-collected.
+_LIVE_STORES: weakref.WeakSet[FaissVectorStore] = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_stores() -> None:
+    for store in list(_LIVE_STORES):
+        store.flush()
+
+
+_METADATA_COLUMNS = (
+    "document_id",
+    "chunk_id",
+    "text",
+    "source",
+    "page_start",
+    "page_end",
+    "content_hash",
+    "page_label",
+)
 
 
 class FaissVectorStore:
+    """FAISS index plus chunk metadata stored column-wise (one list per attribute)."""
+
     def __init__(self, *, index_path: Path | None = None, meta_path: Path | None = None) -> None:
         self.index_path = index_path or INDEX_PATH
         self.meta_path = meta_path or META_PATH
         self.index_path.parent.mkdir(parents=True, exist_ok=True)
         self.meta_path.parent.mkdir(parents=True, exist_ok=True)
         self.index: faiss.Index | None = None
-        self.metadata: List[Metadata] = []
+        self.columns: Dict[str, List[Any]] = {name: [] for name in _METADATA_COLUMNS}
+        self.field_columns: Dict[str, List[str | None]] = {}
+        self.fields_index: Dict[str, List[int]] = {}
+        # Rows already on disk are read through this view; ``columns`` holds the rows after it.
+        self._mapped: _MappedRows | None = None
+        # API handlers call add/search from worker threads; keep index and columns aligned.
+        self._lock = threading.RLock()
+        self._dirty = False
+        # Rows already in the metadata sidecar; -1 forces a full rewrite on the next persist.
+        self._persisted_rows = 0
+        self._last_persist = time.monotonic()
+        # Single-query search copies into this (1, d) float32 row; guarded by ``_lock``.
+        self._query_buffer: np.ndarray | None = None
         self._load()
+        _LIVE_STORES.add(self)
+
+    @property
+    def metadata(self) -> List[Metadata]:
+        """Materialise every stored row; prefer ``row``/``search`` on hot paths."""
+        return [self.row(position) for position in range(self.size())]
 
     def _load(self) -> None:
         if self.index_path.exists():
             self.index = faiss.read_index(str(self.index_path))
-        if self.meta_path.exists():
+        legacy_path = self.meta_path.with_suffix(".pkl")
+        if self.meta_path.exists() and self.meta_path.stat().st_size:
             with self.meta_path.open("rb") as fh:
-                data = pickle.load(fh)
-                self.metadata = data if isinstance(data, list) else []
-        if self.index is None and self.metadata:
-            self.metadata = []
+                is_pickle = fh.read(1) == b"\x80"
+            if is_pickle:
+                self._load_pickle(self.meta_path.read_bytes())
+            else:
+                self._load_rows()
+        elif legacy_path.exists():
+            self._load_pickle(legacy_path.read_bytes())
+        if self.index is None and self.size():
+            self._mapped = None
+            self.columns = {name: [] for name in _METADATA_COLUMNS}
+            self.field_columns = {}
+            self.fields_index = {}
+            self._persisted_rows = -1
+
+    def _load_rows(self) -> None:
+        # Start-up cost is a newline scan of the mapped file; rows are parsed when read.
+        self._mapped = _MappedRows(self.meta_path)
+        self._persisted_rows = len(self._mapped)
+        if self._mapped.torn:
+            # A torn trailing row from an interrupted append; rewrite without it.
+            LOGGER.warning("Skipping unreadable metadata row in %s", self.meta_path)
+            self._persisted_rows = -1
+
+    def _load_pickle(self, data: bytes) -> None:
+        """Read the pickled layouts used before the JSONL sidecar; rewritten on next persist."""
+        payload = pickle.loads(data)
+        if isinstance(payload, list):
+            # Pickled list of Metadata objects.
+            self._append_rows(payload)
+        elif isinstance(payload, dict):
+            self.columns.update(payload.get("columns", {}))
+            if len(self.columns["page_label"]) != len(self.columns["chunk_id"]):
+                self.columns["page_label"] = [
+                    format_page_label(start, end)
+                    for start, end in zip(
+                        self.columns["page_start"], self.columns["page_end"], strict=True
+                    )
+                ]
+            self.field_columns = payload.get("field_columns", {})
+            self._index_fields(0)
+        self._persisted_rows = -1
+
+    def _append_rows(self, metadatas: Sequence[Metadata]) -> None:
+        values = {
+            name: [getattr(meta, name, None) for meta in metadatas] for name in _METADATA_COLUMNS
+        }
+        values["page_label"] = [
+            getattr(meta, "page_label", "") or format_page_label(meta.page_start, meta.page_end)
+            for meta in metadatas
+        ]
+        self._extend_columns(values, [meta.fields for meta in metadatas])
+
+    def _extend_columns(
+        self, values: Dict[str, List[Any]], fields: Sequence[Dict[str, str]]
+    ) -> None:
+        """Append rows given column-wise, plus each row's extracted fields."""
+        start = len(self.columns["chunk_id"])
+        for name, column in values.items():
+            self.columns[name].extend(column)
+        for name in set().union(*fields) - self.field_columns.keys():
+            self.field_columns[name] = [None] * start
+        for name, column in self.field_columns.items():
+            column.extend(row.get(name) for row in fields)
+        self._index_fields(start)
+
+    def _index_fields(self, start: int) -> None:
+        """Record which in-memory rows (from column index ``start`` onward) carry each field."""
+        base = self._mapped_count()
+        for name, column in self.field_columns.items():
+            positions = [base + index for index in range(start, len(column)) if column[index]]
+            if positions:
+                self.fields_index.setdefault(name, []).extend(positions)
 
     def _persist(self) -> None:
         if self.index is not None:
             faiss.write_index(self.index, str(self.index_path))
-        with self.meta_path.open("wb") as fh:
-            pickle.dump(self.metadata, fh)
+        start = max(self._persisted_rows, self._mapped_count())
+        payload = b"".join(
+            _dumps(self._row_dict(position)) + b"\n" for position in range(start, self.size())
+        )
+        if self._persisted_rows < 0:
+            mapped = self._mapped.valid_bytes() if self._mapped is not None else b""
+            tmp_path = self.meta_path.with_name(self.meta_path.name + ".tmp")
+            tmp_path.write_bytes(mapped + payload)
+            os.replace(tmp_path, self.meta_path)
+        elif payload:
+            with self.meta_path.open("ab") as fh:
+                fh.write(payload)
+        self._persisted_rows = self.size()
+        self._dirty = False
+        self._last_persist = time.monotonic()
+
+    def _row_dict(self, position: int) -> Dict[str, Any]:
+        position -= self._mapped_count()
+        row = {name: column[position] for name, column in self.columns.items()}
+        row["fields"] = {
+            name: value
+            for name, column in self.field_columns.items()
+            if (value := column[position]) is not None
+        }
+        return row
 
-    def add(self, embeddings: Sequence[Sequence[float]], metadatas: Sequence[Metadata]) -> None:
-        if not embeddings:
+    def flush(self) -> None:
+        """Write pending vectors and metadata to disk."""
+        with self._lock:
+            if self._dirty:
+                self._persist()
+
+    def add(
+        self,
+        embeddings: Sequence[Sequence[float]] | np.ndarray,
+        metadatas: Sequence[Metadata],
+    ) -> None:
+        """Index ``embeddings`` (L2-normalised) with their metadata.
+
+        Vectors are normalised in a float32 copy; the caller's array is never modified.
+        """
+        if len(embeddings) == 0:
             return
-        vectors = np.array(embeddings, dtype="float32")
+        vectors = np.array(embeddings, dtype=np.float32, order="C", copy=True)
         faiss.normalize_L2(vectors)
-        if self.index is None:
-            dimension = vectors.shape[1]
-            self.index = faiss.IndexFlatIP(dimension)
-        self.index.add(vectors)
-        self.metadata.extend(metadatas)
-        self._persist()
+        with self._lock:
+            if self.index is None:
+                dimension = vectors.shape[1]
+                self.index = faiss.IndexFlatIP(dimension)
+            self.index.add(vectors)
+            if _should_build_ann(self.index):
+                self.index = _build_ann(self.index)
+            elif _should_quantize(self.index):
+                self.index = _build_sq8(self.index)
+            self._append_rows(metadatas)
+            self._dirty = True
+            pending = self.size() - max(self._persisted_rows, 0)
+            if (
+                pending >= PERSIST_EVERY
+                or time.monotonic() - self._last_persist >= PERSIST_INTERVAL
+            ):
+                self._persist()
+
+    def row(self, position: int) -> Metadata:
+        """Build the ``Metadata`` view of a single stored chunk."""
+        mapped = self._mapped
+        if mapped is not None:
+            if position < len(mapped):
+                return Metadata(**mapped.get(position))
+            position -= len(mapped)
+        columns = self.columns
+        fields = {
+            name: value
+            for name, column in self.field_columns.items()
+            if (value := column[position]) is not None
+        }
+        return Metadata(
+            document_id=columns["document_id"][position],
+            chunk_id=columns["chunk_id"][position],
+            text=columns["text"][position],
+            source=columns["source"][position],
+            page_start=columns["page_start"][position],
+            page_end=columns["page_end"][position],
+            fields=fields,
+            content_hash=columns["content_hash"][position],
+            page_label=columns["page_label"][position],
+        )
 
     def search(
         self, embedding: Sequence[float] | Iterable[float], k: int
     ) -> List[tuple[float, Metadata]]:
+        """Search one query, reusing a preallocated float32 row instead of a fresh copy."""
+        with self._lock:
+            index = self.index
+            if index is None:
+                return []
+            buffer = self._query_buffer
+            if buffer is None or buffer.shape[1] != index.d:
+                buffer = self._query_buffer = np.empty((1, index.d), dtype=np.float32)
+            # Copying also keeps normalize_L2 off the caller's (possibly cached) vector.
+            buffer[0] = np.asarray(embedding, dtype=np.float32)
+            faiss.normalize_L2(buffer)
+            return self._search_locked(index, buffer, k)[0]
+
+    def search_batch(
+        self, embeddings: Sequence[Sequence[float] | Iterable[float]] | np.ndarray, k: int
+    ) -> List[List[tuple[float, Metadata]]]:
+        """Search several queries with one ``index.search`` call (parallel inside FAISS)."""
         if self.index is None:
-            return []
-        vector = np.array([embedding], dtype="float32")
-        faiss.normalize_L2(vector)
-        scores, indices = self.index.search(vector, k)
-        results: List[tuple[float, Metadata]] = []
-        for score, idx in zip(scores[0], indices[0], strict=True):
-            if idx == -1:
-                continue
-            if idx < len(self.metadata):
-                results.append((float(score), self.metadata[idx]))
+            return [[] for _ in range(len(embeddings))]
+        vectors = np.array(embeddings, dtype="float32", ndmin=2)
+        faiss.normalize_L2(vectors)
+        with self._lock:
+            return self._search_locked(self.index, vectors, k)
+
+    def _search_locked(
+        self, index: faiss.Index, vectors: np.ndarray, k: int
+    ) -> List[List[tuple[float, Metadata]]]:
+        scores, indices = index.search(vectors, k)
+        size = self.size()
+        results: List[List[tuple[float, Metadata]]] = []
+        for query_scores, query_indices in zip(scores.tolist(), indices.tolist(), strict=True):
+            results.append(
+                [
+                    (score, self.row(idx))
+                    for score, idx in zip(query_scores, query_indices, strict=True)
+                    if 0 <= idx < size
+                ]
+            )
         return results
 
+    def find_field(self, name: str) -> Metadata | None:
+        """Return the first stored chunk carrying a value for ``name``."""
+        with self._lock:
+            if self._mapped is not None:
+                found = self._mapped.first_with_field(name)
+                if found is not None:
+                    return self.row(found)
+            positions = self.fields_index.get(name)
+            if not positions:
+                return None
+            return self.row(positions[0])
+
     def size(self) -> int:
-        return len(self.metadata)
+        return self._mapped_count() + len(self.columns["chunk_id"])
+
+    def _mapped_count(self) -> int:
+        return len(self._mapped) if self._mapped is not None else 0
+
+
+class _MappedRows:
+    """Read-only memory map of ``meta.jsonl``; a row is parsed only when it is read."""
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        # Row ``i`` ends at ``_ends[i]``; one vectorised newline scan replaces parsing.
+        self._ends = np.flatnonzero(np.frombuffer(self._map, dtype=np.uint8) == ord("\n"))
+        self._valid_size = int(self._ends[-1]) + 1 if len(self._ends) else 0
+        self.torn = self._valid_size != len(self._map)
+        self._first_with_field: Dict[str, int | None] = {}
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def get(self, position: int) -> Dict[str, Any]:
+        start = int(self._ends[position - 1]) + 1 if position else 0
+        return _loads(self._map[start : int(self._ends[position])])
+
+    def valid_bytes(self) -> bytes:
+        """Every complete row, as written."""
+        return self._map[: self._valid_size]
+
+    def first_with_field(self, name: str) -> int | None:
+        """Position of the first row with a value for field ``name``, or ``None``."""
+        if name in self._first_with_field:
+            return self._first_with_field[name]
+        # Only rows whose raw bytes contain the key are parsed.
+        needle = _dumps(name) + b":"
+        found = None
+        offset = self._map.find(needle, 0, self._valid_size)
+        while offset != -1:
+            position = int(np.searchsorted(self._ends, offset))
+            if self.get(position).get("fields", {}).get(name):
+                found = position
+                break
+            offset = self._map.find(needle, int(self._ends[position]) + 1, self._valid_size)
+        self._first_with_field[name] = found
+        return found
+
+
+def _should_build_ann(index: faiss.Index) -> bool:
+    return (
+        IVF_THRESHOLD > 0
+        and isinstance(index, (faiss.IndexFlat, faiss.IndexScalarQuantizer))
+        and index.ntotal >= IVF_THRESHOLD
+    )
+
+
+def _should_quantize(index: faiss.Index) -> bool:
+    # An ANN rebuild trains on reconstructed vectors, so the flat index stays exact until then.
+    return (
+        IVF_THRESHOLD <= 0
+        and SQ_TRAIN_SIZE > 0
+        and isinstance(index, faiss.IndexFlat)
+        and index.ntotal >= SQ_TRAIN_SIZE
+    )
+
+
+def _build_sq8(flat: faiss.Index) -> faiss.Index:
+    """Rebuild a flat inner-product index as int8 scalar-quantized, trained on its vectors."""
+    vectors = flat.reconstruct_n(0, flat.ntotal)
+    index = faiss.IndexScalarQuantizer(
+        flat.d, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+    )
+    index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def _build_ann(flat: faiss.Index) -> faiss.Index:
+    if ANN_KIND == "hnsw":
+        return _build_hnsw(flat)
+    return _build_ivf(flat)
+
+
+def _build_hnsw(flat: faiss.Index) -> faiss.Index:
+    """Rebuild a flat or SQ8 inner-product index as an HNSW graph (efSearch persists with it)."""
+    index = faiss.IndexHNSWFlat(flat.d, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.hnsw.efSearch = HNSW_EF_SEARCH
+    index.add(flat.reconstruct_n(0, flat.ntotal))
+    return index
+
+
+def _build_ivf(flat: faiss.Index) -> faiss.Index:
+    """Rebuild a flat or SQ8 inner-product index as quantized IVF with nlist ~ 2*sqrt(N) lists."""
+    count = flat.ntotal
+    vectors = flat.reconstruct_n(0, count)
+    nlist = max(int(2 * math.sqrt(count)), 20)
+    index = faiss.index_factory(flat.d, f"IVF{nlist},{IVF_CODEC}", faiss.METRIC_INNER_PRODUCT)
+    index.train(vectors)
+    index.add(vectors)
+    faiss.extract_index_ivf(index).nprobe = IVF_NPROBE or min(max(nlist // 4, 1), 10)
+    return index
@@ -20,6 +20,8 @@ else:  # pragma: no cover - runtime import resolution
 load_dotenv()
 
 API_URL = os.getenv("API_URL", "http://localhost:8000")
+# The raw-events view renders at most this many trailing bytes of the ledger.
+RAW_EVENTS_MAX_BYTES = int(os.getenv("HIST_RAW_EVENTS_MAX_BYTES", str(1024 * 1024)))
 
 
 def _format_page_label(page_start: int | None, page_end: int | None) -> str:
@@ -30,6 +32,24 @@ def _format_page_label(page_start: int | None, page_end: int | None) -> str:
     return f"Pages {page_start}–{page_end}"
 
 
+@st.cache_data(ttl=30)
+def _cached_summary(path: str, mtime_ns: int, size: int) -> Dict[str, object]:
+    """Summarize once per ledger version; ``mtime_ns``/``size`` only key the cache."""
+    return summarize(path)
+
+
+def _raw_events_tail(path: Path, limit: int) -> tuple[str, bool]:
+    """Return whole ledger lines from the last ``limit`` bytes and whether it was cut."""
+    with path.open("rb") as handle:
+        size = handle.seek(0, os.SEEK_END)
+        truncated = size > limit
+        handle.seek(max(size - limit, 0))
+        data = handle.read()
+    if truncated:
+        data = data[data.find(b"\n") + 1 :]
+    return data.decode("utf-8", errors="replace").strip(), truncated
+
+
 st.set_page_config(page_title="Policy Assistant", layout="wide")
 st.title("Policy Assistant Chatbot")
 
@@ -90,14 +110,15 @@ with history_tab:
     ledger_path = Path(os.getenv("HIST_LEDGER", "data/historian/ledger.jsonl"))
     st.subheader("Historian Summary")
     if ledger_path.exists():
-        summary = summarize(ledger_path)
+        stat = ledger_path.stat()
+        summary = _cached_summary(str(ledger_path), stat.st_mtime_ns, stat.st_size)
         st.json(summary)
         with st.expander("Raw events"):
-            with ledger_path.open("r", encoding="utf-8") as handle:
-                for line in handle:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    st.code(line, language="json")
+            # One code block for the whole view: a block per line freezes the browser
+            # on large ledgers.
+            raw_events, truncated = _raw_events_tail(ledger_path, RAW_EVENTS_MAX_BYTES)
+            if truncated:
+                st.caption(f"Showing the most recent {RAW_EVENTS_MAX_BYTES // 1024} KB.")
+            st.code(raw_events, language="json")
     else:
         st.info("Ledger not created yet. Run an ingest or query to populate history.")
@@ -1,6 +1,68 @@
+import functools
 import sys
 from pathlib import Path
+from typing import Callable
+
+import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+_PDF_HEADER = b"%PDF-1.4\n"
+_PDF_FIXED_OBJECTS = (
+    b"1 0 obj<< /Type /Catalog /Pages 2 0 R >>endobj\n",
+    b"2 0 obj<< /Type /Pages /Kids [3 0 R] /Count 1 >>endobj\n",
+    (
+        b"3 0 obj<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 144] "
+        b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>endobj\n"
+    ),
+)
+_PDF_FONT_OBJECT = b"5 0 obj<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>endobj\n"
+
+
+@functools.lru_cache(maxsize=None)
+def _build_pdf_bytes(text: str) -> bytes:
+    """Return a minimal one-page PDF drawing ``text`` in Helvetica."""
+    stream = f"BT /F1 12 Tf 72 72 Td ({text}) Tj ET".encode("utf-8")
+    objects = [
+        *_PDF_FIXED_OBJECTS,
+        b"4 0 obj<< /Length %d >>stream\n%b\nendstream\nendobj\n" % (len(stream), stream),
+        _PDF_FONT_OBJECT,
+    ]
+    offsets = []
+    current = len(_PDF_HEADER)
+    for obj in objects:
+        offsets.append(current)
+        current += len(obj)
+    count = len(objects) + 1
+    return b"".join(
+        [
+            _PDF_HEADER,
+            *objects,
+            b"xref\n0 %d\n0000000000 65535 f \n" % count,
+            *(b"%010d 00000 n \n" % offset for offset in offsets),
+            b"trailer<< /Root 1 0 R /Size %d >>\n" % count,
+            b"startxref\n%d\n%%%%EOF" % current,
+        ]
+    )
+
+
+@pytest.fixture(scope="session")
+def make_pdf_bytes() -> Callable[[str], bytes]:
+    """Build (and memoize per text) a minimal single-page PDF."""
+    return _build_pdf_bytes
+
+
+@pytest.fixture(autouse=True)
+def _fresh_shared_clients():
+    """Give every test its own env-parsed process-wide singletons."""
+    from src.core.cost_guard import CostGuard
+    from src.llm.openai_client import OpenAIClient
+
+    CostGuard.reset_shared()
+    OpenAIClient.reset_shared()
+    yield
+    CostGuard.reset_shared()
+    OpenAIClient.reset_shared()
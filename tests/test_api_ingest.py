@@ -6,49 +6,11 @@ from fastapi.testclient import TestClient
 from src.core.cost_guard import estimate_tokens
 
 
-def _make_pdf_bytes(text: str) -> bytes:
-    header = b"%PDF-1.4\n"
-    objects = [
-        b"1 0 obj<< /Type /Catalog /Pages 2 0 R >>endobj\n",
-        b"2 0 obj<< /Type /Pages /Kids [3 0 R] /Count 1 >>endobj\n",
-        (
-            b"3 0 obj<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 144] "
-            b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>endobj\n"
-        ),
-    ]
-    stream = f"BT /F1 12 Tf 72 72 Td ({text}) Tj ET".encode("utf-8")
-    objects.append(
-        b"4 0 obj<< /Length "
-        + str(len(stream)).encode("ascii")
-        + b" >>stream\n"
-        + stream
-        + b"\nendstream\nendobj\n"
-    )
-    objects.append(b"5 0 obj<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>endobj\n")
-
-    body = b""
-    offsets = []
-    current = len(header)
-    for obj in objects:
-        offsets.append(current)
-        body += obj
-        current += len(obj)
-
-    xref = b"xref\n0 " + str(len(objects) + 1).encode("ascii") + b"\n"
-    xref += b"0000000000 65535 f \n"
-    for offset in offsets:
-        xref += f"{offset:010d} 00000 n \n".encode("ascii")
-    trailer = b"trailer<< /Root 1 0 R /Size " + str(len(objects) + 1).encode("ascii") + b" >>\n"
-    startxref = len(header) + len(body)
-    eof = b"startxref\n" + str(startxref).encode("ascii") + b"\n%%EOF"
-    return header + body + xref + trailer + eof
-
-
 @pytest.fixture
 def ingest_client(tmp_path, monkeypatch):
     monkeypatch.setenv("DATA_DIR", str(tmp_path))
     monkeypatch.setenv("REDACT_PII", "false")
-    monkeypatch.setenv("EMBED_CACHE_PATH", str(tmp_path / "emb.pkl"))
+    monkeypatch.setenv("EMBED_CACHE_PATH", str(tmp_path / "emb.bin"))
     monkeypatch.setenv("MAX_TOKENS", "300")
     monkeypatch.setenv("MAX_EMBED_TOKENS", "300")
     monkeypatch.setenv("CHUNK_MAX_CHARS", "1200")
@@ -68,14 +30,14 @@ def ingest_client(tmp_path, monkeypatch):
     def fake_embed(texts):
         return [[float(i + 1)] for i, _text in enumerate(texts)]
 
-    app_module.embedding_service.client.embed_texts = fake_embed
+    monkeypatch.setattr(app_module.embedding_service.client, "embed_texts", fake_embed)
     return TestClient(app_module.app)
 
 
-def test_ingest_allows_large_batches_with_small_chunks(ingest_client):
+def test_ingest_allows_large_batches_with_small_chunks(ingest_client, make_pdf_bytes):
     sentence = "This policy statement ensures compliance with regulatory requirements."
     text = " ".join([sentence] * 40)
-    pdf_bytes = _make_pdf_bytes(text)
+    pdf_bytes = make_pdf_bytes(text)
 
     response = ingest_client.post(
         "/ingest",
@@ -87,7 +49,7 @@ def test_ingest_allows_large_batches_with_small_chunks(ingest_client):
     assert payload["chunks"] >= 2
 
 
-def test_ingest_many_small_chunks_exceeding_chat_budget(monkeypatch, ingest_client):
+def test_ingest_many_small_chunks_exceeding_chat_budget(monkeypatch, ingest_client, make_pdf_bytes):
     from src.api import app as app_module
     from src.core import chunk as chunk_module
 
@@ -98,7 +60,7 @@ def test_ingest_many_small_chunks_exceeding_chat_budget(monkeypatch, ingest_clie
 
     sentence = "Policy reminder: follow procedure A before proceeding to step B."
     text = " ".join([sentence] * 60)
-    pdf_bytes = _make_pdf_bytes(text)
+    pdf_bytes = make_pdf_bytes(text)
 
     chunks = small_chunker(text)
     assert len(chunks) > 40  # plenty of small chunks
@@ -113,3 +75,25 @@ def test_ingest_many_small_chunks_exceeding_chat_budget(monkeypatch, ingest_clie
     assert response.status_code == 200
     payload = response.json()
     assert payload["chunks"] == len(chunks)
+
+
+def test_ingest_persists_chunks_before_responding(
+    monkeypatch, tmp_path, ingest_client, make_pdf_bytes
+):
+    from src.store import faiss_store
+
+    monkeypatch.setattr(faiss_store, "PERSIST_EVERY", 1_000_000)
+    monkeypatch.setattr(faiss_store, "PERSIST_INTERVAL", 3600.0)
+    pdf_bytes = make_pdf_bytes("This policy statement ensures compliance. " * 10)
+
+    response = ingest_client.post(
+        "/ingest",
+        files={"file": ("policy.pdf", pdf_bytes, "application/pdf")},
+    )
+
+    assert response.status_code == 200
+    reloaded = faiss_store.FaissVectorStore(
+        index_path=tmp_path / "index.faiss",
+        meta_path=tmp_path / "meta.pkl",
+    )
+    assert reloaded.size() == response.json()["chunks"]
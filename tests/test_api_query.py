@@ -1,4 +1,5 @@
 import importlib
+import json
 
 import pytest
 from fastapi.testclient import TestClient
@@ -21,11 +22,15 @@ def client(tmp_path, monkeypatch):
     app_module.retriever = app_module.Retriever(app_module.vector_store)
 
     # Patch embeddings to deterministic vectors
-    app_module.embedding_service.embed_query = lambda _: [1.0, 0.0]
-    app_module.embedding_service.embed_documents = lambda texts: [[1.0, 0.0] for _ in texts]
+    monkeypatch.setattr(app_module.embedding_service, "embed_query", lambda _: [1.0, 0.0])
+    monkeypatch.setattr(
+        app_module.embedding_service, "embed_documents", lambda texts: [[1.0, 0.0] for _ in texts]
+    )
 
     # Patch OpenAI chat to deterministic answer
-    app_module.openai_client.chat = lambda query, context_blocks: "Answer with citations"
+    monkeypatch.setattr(
+        app_module.openai_client, "chat", lambda query, context_blocks: "Answer with citations"
+    )
 
     # Pre-populate store with a single chunk
     app_module.vector_store.add(
@@ -53,3 +58,92 @@ def test_query_endpoint(client):
     assert payload["answer"] == "Answer with citations"
     assert payload["sources"][0]["chunk_id"] == "chunk-1"
     assert payload["sources"][0]["page_start"] == 1
+
+
+def test_query_ledger_hits_use_content_hash(client, tmp_path):
+    from src.core.chunk import content_hash
+
+    response = client.post("/query", json={"query": "What is the policy?", "top_k": 1})
+    assert response.status_code == 200
+
+    from src.api import app as app_module
+
+    app_module.ledger.flush()
+    lines = (tmp_path / "ledger.jsonl").read_text(encoding="utf-8").strip().splitlines()
+    event = json.loads(lines[-1])
+    assert event["hits"][0]["chunk_id"] == content_hash("Policy content")
+
+
+def test_query_ledger_hit_ids_ignore_redaction(client, tmp_path):
+    from src.api import app as app_module
+    from src.core.chunk import content_hash
+
+    raw_text = "Contact person@example.com about the policy"
+    app_module.vector_store = app_module.FaissVectorStore(
+        index_path=tmp_path / "pii.faiss", meta_path=tmp_path / "pii.jsonl"
+    )
+    app_module.retriever = app_module.Retriever(app_module.vector_store)
+    app_module.vector_store.add(
+        embeddings=[[1.0, 0.0]],
+        metadatas=[
+            app_module.Metadata(
+                document_id="doc.pdf", chunk_id="chunk-1", text=raw_text, source="doc.pdf"
+            )
+        ],
+    )
+
+    for redact in (True, False):
+        response = client.post(
+            "/query", json={"query": f"Who to contact? {redact}", "top_k": 1, "redact": redact}
+        )
+        assert response.status_code == 200
+
+    app_module.ledger.flush()
+    lines = (tmp_path / "ledger.jsonl").read_text(encoding="utf-8").strip().splitlines()
+    hit_ids = [json.loads(line)["hits"][0]["chunk_id"] for line in lines[-2:]]
+    assert hit_ids == [content_hash(raw_text)] * 2
+
+
+def test_query_reuses_semantic_cache(client, monkeypatch):
+    from src.api import app as app_module
+
+    calls = []
+
+    def counting_chat(query, context_blocks):
+        calls.append(query)
+        return "Answer with citations"
+
+    monkeypatch.setattr(app_module.openai_client, "chat", counting_chat)
+
+    first = client.post("/query", json={"query": "What is the policy?", "top_k": 1})
+    second = client.post("/query", json={"query": "Explain the policy", "top_k": 1})
+
+    assert first.json() == second.json()
+    assert calls == ["What is the policy?"]
+
+
+def test_concurrent_identical_chats_share_one_call(client, monkeypatch):
+    import asyncio
+    import threading
+
+    from src.api import app as app_module
+
+    calls = []
+    release = threading.Event()
+
+    def slow_chat(query, context_blocks):
+        calls.append(query)
+        release.wait(timeout=5)
+        return "shared answer"
+
+    monkeypatch.setattr(app_module.openai_client, "chat", slow_chat)
+
+    async def run_both():
+        first = asyncio.ensure_future(app_module._coalesced_chat("q", ["ctx"]))
+        second = asyncio.ensure_future(app_module._coalesced_chat("q", ["ctx"]))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(run_both()) == ["shared answer", "shared answer"]
+    assert calls == ["q"]
@@ -1,6 +1,13 @@
 import importlib
 
-from src.core.chunk import Chunk, chunk_text, format_page_label, map_offsets_to_page_range
+from src.core.chunk import (
+    Chunk,
+    chunk_text,
+    content_hash,
+    format_page_label,
+    map_chunks_to_page_ranges,
+    map_offsets_to_page_range,
+)
 
 
 def test_chunk_simple_split():
@@ -47,8 +54,72 @@ def test_map_offsets_to_page_range_handles_boundaries():
     spanning = Chunk(id="c", text="", start=10, end=50)
     assert map_offsets_to_page_range(spanning, page_breaks) == (1, 3)
 
+    empty = Chunk(id="d", text="", start=14, end=14)
+    chunks = [first, second, spanning, empty]
+    assert map_chunks_to_page_ranges(chunks, page_breaks) == [
+        map_offsets_to_page_range(chunk, page_breaks) for chunk in chunks
+    ]
+    assert map_chunks_to_page_ranges(chunks, []) == [(1, 1)] * 4
+
 
 def test_format_page_label():
     assert format_page_label(None, None) == ""
     assert format_page_label(1, 1) == "Page 1"
     assert format_page_label(2, 3) == "Pages 2–3"
+
+
+def test_content_hash_is_short_and_stable():
+    digest = content_hash("Policy content")
+    assert len(digest) == 12
+    assert digest == content_hash("Policy content")
+    assert digest != content_hash("Policy content.")
+
+
+def test_chunk_offsets_slice_source_text():
+    text = "  Intro line. " + " ".join(f"Clause {i} applies here." for i in range(40))
+    chunks = chunk_text(text, max_chars=120, overlap=20)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert text[chunk.start : chunk.end] == chunk.text
+        assert len(chunk.text) <= 120
+    assert chunks[-1].text.endswith("Clause 39 applies here.")
+
+
+def test_chunk_ids_are_deterministic_per_document():
+    text = " ".join(f"Sentence {i} of the schedule." for i in range(30))
+    first = chunk_text(text, max_chars=100, overlap=10)
+    second = chunk_text(text, max_chars=100, overlap=10)
+    assert [chunk.id for chunk in first] == [chunk.id for chunk in second]
+    assert len({chunk.id for chunk in first}) == len(first)
+    assert first[0].id.endswith("-000000")
+    assert chunk_text(text + " Extra.", max_chars=100, overlap=10)[0].id != first[0].id
+
+
+def test_chunk_packs_short_sentences_greedily():
+    text = " ".join("Ok." for _ in range(5000))
+    chunks = chunk_text(text, max_chars=100, overlap=0)
+
+    assert all(len(chunk.text) <= 100 for chunk in chunks)
+    # every full chunk is packed to the limit: one more "Ok." would not fit
+    assert all(len(chunk.text) + len(" Ok.") > 100 for chunk in chunks[:-1])
+    assert sum(chunk.text.count("Ok.") for chunk in chunks) == 5000
+
+
+def test_chunk_overlap_near_max_chars_always_advances():
+    text = " ".join(f"S{i} " + "w" * (i % 7) + "." for i in range(200))
+    for overlap in (35, 39, 40, 60):
+        chunks = chunk_text(text, max_chars=40, overlap=overlap)
+        starts = [chunk.start for chunk in chunks]
+        ends = [chunk.end for chunk in chunks]
+
+        assert starts == sorted(set(starts))
+        assert ends == sorted(set(ends))
+        assert all(len(chunk.text) <= 40 for chunk in chunks)
+        assert chunks[-1].end == len(text)
+
+
+def test_hard_split_yields_offsets():
+    from src.core.chunk import _hard_split
+
+    assert list(_hard_split(10, 35, 10)) == [(10, 20), (20, 30), (30, 35)]
+    assert list(_hard_split(0, 20, 10)) == [(0, 10), (10, 20)]
@@ -0,0 +1,95 @@
+"""Tests for the OpenAI usage guards."""
+
+from __future__ import annotations
+
+import threading
+
+from src.core import cost_guard
+from src.core.cost_guard import CostGuard, RateLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps: list[float] = []
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.sleeps.append(seconds)
+
+
+def test_rate_limiter_allows_burst_then_reserves_slots(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cost_guard.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(cost_guard.time, "sleep", clock.sleep)
+    limiter = RateLimiter(2)
+
+    for _ in range(4):
+        limiter.acquire()
+
+    assert clock.sleeps == [0.5, 1.0]
+
+
+def test_rate_limiter_refills_over_time(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cost_guard.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(cost_guard.time, "sleep", clock.sleep)
+    limiter = RateLimiter(2)
+    limiter.acquire()
+    limiter.acquire()
+
+    clock.now += 10
+    limiter.acquire()
+    limiter.acquire()
+
+    assert clock.sleeps == []
+
+
+def test_rate_limiter_disabled_for_non_positive_rate(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cost_guard.time, "sleep", clock.sleep)
+
+    for _ in range(10):
+        RateLimiter(0).acquire()
+
+    assert clock.sleeps == []
+
+
+def test_shared_guard_is_parsed_once_and_reused():
+    first = CostGuard.shared()
+
+    assert CostGuard.shared() is first
+    assert CostGuard.shared().rate_limiter is first.rate_limiter
+    assert CostGuard.from_env() is not first
+
+
+def test_reset_shared_guard_rereads_environment(monkeypatch):
+    monkeypatch.setenv("MAX_TOKENS", "111")
+    assert CostGuard.shared().max_tokens == 111
+
+    monkeypatch.setenv("MAX_TOKENS", "222")
+    assert CostGuard.shared().max_tokens == 111
+    CostGuard.reset_shared()
+    assert CostGuard.shared().max_tokens == 222
+
+
+def test_guard_state_uses_slots():
+    guard = CostGuard.from_env()
+
+    assert not hasattr(guard, "__dict__")
+    assert not hasattr(guard.circuit_breaker, "__dict__")
+    guard.before_request()
+    assert guard.total_requests == 1
+
+
+def test_exponential_backoff_doubles_with_bounded_jitter():
+    waits = cost_guard.exponential_backoff(initial=1.0, maximum=4.0, jitter=0.5)
+    for base in (1.0, 2.0, 4.0, 4.0):
+        assert 0.5 * base <= next(waits) <= 1.5 * base
+
+    exact = cost_guard.exponential_backoff(initial=0.5, maximum=8.0, jitter=0.0)
+    assert [next(exact) for _ in range(6)] == [0.5, 1.0, 2.0, 4.0, 8.0, 8.0]
@@ -2,6 +2,13 @@
 
 from __future__ import annotations
 
+import pickle
+import threading
+
+import numpy as np
+import pytest
+
+from src.core import embeddings as embeddings_module
 from src.core.embeddings import EmbeddingService
 
 
@@ -16,7 +23,7 @@ def test_embedding_batches_allow_large_total_under_per_chunk_limit(tmp_path, mon
     monkeypatch.setenv("MAX_TOKENS", "300")
     monkeypatch.delenv("MAX_EMBED_TOKENS", raising=False)
 
-    cache_file = tmp_path / "emb_cache.pkl"
+    cache_file = tmp_path / "emb_cache.bin"
     service = EmbeddingService(client=DummyClient(), cache_file=cache_file)
 
     # Ten chunks of ~200 characters each (≈50 tokens) would previously exceed the
@@ -26,3 +33,179 @@ def test_embedding_batches_allow_large_total_under_per_chunk_limit(tmp_path, mon
     vectors = service.embed_documents(chunks)
 
     assert len(vectors) == len(chunks)
+
+
+def test_embed_documents_accepts_generator(tmp_path):
+    service = EmbeddingService(client=DummyClient(), cache_file=tmp_path / "emb_cache.bin")
+
+    vectors = service.embed_documents(text for text in ["alpha", "beta", "alpha"])
+
+    assert len(vectors) == 3
+    assert np.array_equal(vectors[0], vectors[2])
+
+
+def test_embed_query_reuses_normalized_text(tmp_path):
+    calls = []
+
+    class CountingClient(DummyClient):
+        def embed_texts(self, texts):  # type: ignore[override]
+            calls.append(list(texts))
+            return super().embed_texts(texts)
+
+    service = EmbeddingService(client=CountingClient(), cache_file=tmp_path / "emb_cache.bin")
+
+    first = service.embed_query("What is the  Policy number?")
+    second = service.embed_query("what is the policy number?")
+
+    assert np.array_equal(first, second)
+    assert len(calls) == 1
+
+
+def test_cache_round_trips_float32_frames(tmp_path):
+    cache_file = tmp_path / "emb_cache.bin"
+    service = EmbeddingService(client=DummyClient(), cache_file=cache_file)
+    vectors = service.embed_documents(["alpha", "beta"])
+
+    reloaded = EmbeddingService(client=DummyClient(), cache_file=cache_file)
+
+    assert cache_file.read_bytes().startswith(b"EMBC2\n")
+    assert len(reloaded._cache) == 2
+    for key, vector in reloaded._cache.items():
+        assert vector.dtype == np.float32
+        assert np.array_equal(vector, service._cache[key])
+    assert np.array_equal(reloaded.embed_documents(["beta"])[0], vectors[1])
+
+
+def test_outdated_cache_format_is_discarded(tmp_path):
+    cache_file = tmp_path / "emb_cache.bin"
+    cache_file.write_bytes(pickle.dumps({"0" * 64: [0.5, 0.25]}))
+
+    service = EmbeddingService(client=DummyClient(), cache_file=cache_file)
+
+    assert service._cache == {}
+    assert cache_file.read_bytes() == b"EMBC2\n"
+
+
+def test_cache_keys_are_short_blake2b_digests():
+    key = EmbeddingService._hash_text("alpha")
+
+    assert len(key) == 32
+    assert key == EmbeddingService._hash_text("alpha")
+    assert key != EmbeddingService._hash_text("beta")
+
+
+def test_persist_appends_only_new_frames(tmp_path):
+    cache_file = tmp_path / "emb_cache.bin"
+    service = EmbeddingService(client=DummyClient(), cache_file=cache_file)
+    service.embed_documents(["alpha"])
+    first_size = cache_file.stat().st_size
+
+    service.embed_documents(["alpha", "beta"])
+    second_size = cache_file.stat().st_size
+
+    assert cache_file.read_bytes().count(b"EMBC2\n") == 1
+    assert second_size - first_size == first_size - len(b"EMBC2\n")
+
+
+def test_torn_tail_and_stale_frames_are_compacted(tmp_path):
+    cache_file = tmp_path / "emb_cache.bin"
+    service = EmbeddingService(client=DummyClient(), cache_file=cache_file)
+    service.embed_documents(["alpha", "beta"])
+    intact = cache_file.read_bytes()
+    cache_file.write_bytes(intact + b"\x40\x00\x00")
+
+    reloaded = EmbeddingService(client=DummyClient(), cache_file=cache_file)
+
+    assert len(reloaded._cache) == 2
+    assert cache_file.read_bytes() == intact
+
+
+def test_duplicate_texts_are_requested_once_in_first_seen_order(tmp_path):
+    calls = []
+
+    class CountingClient(DummyClient):
+        def embed_texts(self, texts):  # type: ignore[override]
+            calls.append(list(texts))
+            return super().embed_texts(texts)
+
+    service = EmbeddingService(client=CountingClient(), cache_file=tmp_path / "emb_cache.bin")
+
+    vectors = service.embed_documents(["beta", "alpha", "beta", "gamma", "alpha"])
+
+    assert calls == [["beta", "alpha", "gamma"]]
+    assert [vector[0] for vector in vectors] == [0.0, 1.0, 0.0, 2.0, 1.0]
+
+    calls.clear()
+    service.embed_documents(("gamma", "delta", "alpha", "delta"))
+    assert calls == [["delta"]]
+
+
+def test_batches_are_requested_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings_module, "BATCH_SIZE", 2)
+    monkeypatch.setattr(embeddings_module, "EMBED_CONCURRENCY", 3)
+    barrier = threading.Barrier(3, timeout=5)
+
+    class BlockingClient:
+        def embed_texts(self, texts):  # type: ignore[override]
+            barrier.wait()  # only passes when all three batches are in flight together
+            return [[float(len(text)), 0.0] for text in texts]
+
+    service = EmbeddingService(client=BlockingClient(), cache_file=tmp_path / "emb_cache.bin")
+    texts = ["a" * length for length in range(1, 7)]
+
+    vectors = service.embed_documents(texts)
+
+    assert [vector[0] for vector in vectors] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+
+
+def test_oversized_input_is_rejected_before_request(tmp_path):
+    service = EmbeddingService(client=DummyClient(), cache_file=tmp_path / "emb_cache.bin")
+    service.embed_max_tokens = 10
+
+    service.embed_documents(["a" * 40])
+    with pytest.raises(ValueError, match="MAX_EMBED_TOKENS"):
+        service.embed_documents(["short", "b" * 44, "tiny"])
+
+
+def test_embed_documents_returns_float32_matrix(tmp_path):
+    service = EmbeddingService(client=DummyClient(), cache_file=tmp_path / "emb_cache.bin")
+
+    matrix = service.embed_documents(["alpha", "beta", "alpha"])
+
+    assert matrix.shape == (3, 2)
+    assert matrix.dtype == np.float32
+    assert service.embed_documents([]).shape == (0, 0)
+
+
+def test_fully_cached_inputs_skip_request_and_persist(tmp_path, monkeypatch):
+    service = EmbeddingService(client=DummyClient(), cache_file=tmp_path / "emb_cache.bin")
+    first = service.embed_documents(["alpha", "beta"])
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("cache hits must not request or persist")
+
+    monkeypatch.setattr(service, "_request_embeddings", _fail)
+    monkeypatch.setattr(service, "_persist_cache", _fail)
+
+    assert np.array_equal(service.embed_documents(["beta", "alpha"]), first[::-1])
+    assert np.array_equal(service.embed_query("alpha"), first[0])
+
+
+def test_batches_are_packed_by_count_and_token_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings_module, "BATCH_SIZE", 3)
+    monkeypatch.setattr(embeddings_module, "BATCH_TOKENS", 100)
+    monkeypatch.setattr(embeddings_module, "EMBED_CONCURRENCY", 1)
+    calls = []
+
+    class CountingClient(DummyClient):
+        def embed_texts(self, texts):  # type: ignore[override]
+            calls.append(list(texts))
+            return super().embed_texts(texts)
+
+    service = EmbeddingService(client=CountingClient(), cache_file=tmp_path / "emb_cache.bin")
+    # ~60 estimated tokens each for the long texts, 1 for the short ones.
+    texts = ["a" * 240, "b" * 240, "c", "d", "e", "f"]
+
+    service.embed_documents(texts)
+
+    assert calls == [[texts[0]], [texts[1], "c", "d"], ["e", "f"]]
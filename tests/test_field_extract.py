@@ -19,3 +19,20 @@ def test_extract_fields_detects_all_values():
 
 def test_extract_fields_handles_missing():
     assert extract_fields("") == {}
+
+
+def test_extract_fields_matches_overlapping_labels_independently():
+    # The premium label's non-digit run spans the other labels; each field must still
+    # resolve to its own first match, as with separate searches.
+    sample = (
+        "Total premium due, see schedule. Premium shown is payable at inception "
+        "POLICY NUMBER: AB-12 $ 1,250.00"
+    )
+
+    result = extract_fields(sample)
+
+    assert result == {
+        "estimated_total_premium": "12",
+        "premium_at_inception": "12",
+        "policy_number": "AB-12",
+    }
@@ -31,8 +31,11 @@ def test_ledger_appends(tmp_path) -> None:
         answer_chars=12,
     )
 
-    ledger.append(ingest.model_dump())
-    ledger.append(query.model_dump())
+    with ledger:
+        ledger.append(ingest.model_dump())
+        ledger.append(query.model_dump())
+        # Unbuffered by default: other processes see each event as soon as it is appended.
+        assert len(path.read_bytes().splitlines()) == 2
 
     assert path.exists()
     lines = path.read_text(encoding="utf-8").strip().splitlines()
@@ -68,7 +71,7 @@ def test_ledger_rotation(tmp_path) -> None:
         "markers": [],
         "blob": large_payload,
     }
-    ledger.append(first)
+    ledger.append_raw(json.dumps(first).encode("utf-8"))
     second = IngestEvent(
         filename="small.pdf",
         chunks=1,
@@ -81,3 +84,233 @@ def test_ledger_rotation(tmp_path) -> None:
     assert rotated.exists()
     assert path.exists()
     assert len(rotated.read_text(encoding="utf-8").strip().splitlines()) == 1
+    assert next(iter(load_ledger(rotated)))["blob"] == large_payload
+
+
+def test_dumps_line_matches_stdlib_fallback(monkeypatch) -> None:
+    from src.historian import ledger as ledger_module
+
+    payload = {"kind": "query", "query": "prime – ünïcode", "hits": [{"score": 0.5}]}
+    from src.historian import _serialize
+
+    fast = ledger_module.dumps_line(payload)
+    monkeypatch.setattr(_serialize, "orjson", None)
+    slow = ledger_module.dumps_line(payload)
+
+    assert fast.endswith(b"\n") and slow.endswith(b"\n")
+    assert json.loads(fast) == json.loads(slow) == payload
+
+
+def test_load_ledger_parses_bytes_with_either_parser(tmp_path, monkeypatch) -> None:
+    from src.historian import export
+
+    path = tmp_path / "ledger.jsonl"
+    path.write_bytes(
+        b'{"kind": "ingest", "filename": "caf\xc3\xa9.pdf"}\n\n  \n{"kind": "query"}\n'
+    )
+
+    assert [entry["kind"] for entry in load_ledger(path)] == ["ingest", "query"]
+    monkeypatch.setattr(export, "_loads", json.loads)
+    assert summarize(path)["files"] == ["café.pdf"]
+
+
+def test_summarize_counts_queries_past_samples_without_parsing(tmp_path, monkeypatch) -> None:
+    from src.historian import export
+
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(LedgerConfig(path=path, rotate_mb=100))
+    ledger.append(
+        IngestEvent(filename="a.pdf", chunks=1, embed_batches=1, duration_ms=1).model_dump()
+    )
+    for index in range(15):
+        ledger.append(
+            QueryEvent(
+                query=f"q{index}",
+                top_k=1,
+                hits=[],
+                model="m",
+                max_tokens=1,
+                temperature=0.0,
+                latency_ms=1,
+                answer_chars=1,
+            ).model_dump()
+        )
+    ledger.close()
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write('{"filename": "b.pdf", "kind": "ingest"}\n')
+    parsed = []
+    real_loads = export._loads
+    monkeypatch.setattr(export, "_loads", lambda line: parsed.append(line) or real_loads(line))
+
+    summary = summarize(path)
+
+    assert summary["query_events"] == 15
+    assert summary["ingest_events"] == 2
+    assert summary["files"] == ["a.pdf", "b.pdf"]
+    assert [sample["query"] for sample in summary["sample_queries"]] == [
+        f"q{index}" for index in range(10)
+    ]
+    assert len(parsed) == 12
+
+
+def test_summarize_skips_blank_lines_and_reads_unterminated_tail(tmp_path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    path.write_bytes(
+        b'\n{"kind": "ingest", "filename": "a.pdf"}\n  \n\n{"kind": "query", "query": "q"}'
+    )
+
+    summary = summarize(path)
+
+    assert summary["ingest_events"] == 1
+    assert summary["query_events"] == 1
+    assert summary["sample_queries"][0]["query"] == "q"
+    assert summarize(tmp_path / "empty.jsonl")["query_events"] == 0
+    (tmp_path / "empty.jsonl").write_bytes(b"")
+    assert summarize(tmp_path / "empty.jsonl")["files"] == []
+
+
+def test_ledger_keeps_handle_open_and_tracks_size(tmp_path, monkeypatch) -> None:
+    from pathlib import Path
+
+    path = tmp_path / "ledger.jsonl"
+    path.write_bytes(b'{"kind": "note"}\n')
+    ledger = Ledger(LedgerConfig(path=path, rotate_mb=1))
+    opens = []
+    real_open = Path.open
+
+    def _tracking_open(self, mode="r", *args, **kwargs):
+        if mode == "ab":
+            opens.append(self)
+        return real_open(self, mode, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "open", _tracking_open)
+
+    for index in range(3):
+        ledger.append({"kind": "note", "index": index})
+    ledger.flush()
+
+    assert len(opens) == 1
+    assert ledger._size == path.stat().st_size
+    assert len(list(load_ledger(path))) == 4
+
+    # Each of these would push the file past 1 MB, so it starts a fresh file first.
+    ledger.append({"kind": "note", "blob": "x" * (1024 * 1024)})
+    ledger.append({"kind": "note", "after": True})
+    ledger.close()
+
+    assert len(opens) == 3
+    assert len(list(load_ledger(path.with_name("ledger.r1.jsonl")))) == 4
+    assert "blob" in next(iter(load_ledger(path.with_name("ledger.r2.jsonl"))))
+    assert [entry.get("after") for entry in load_ledger(path)] == [True]
+
+
+def test_ledger_buffers_only_when_opted_in(tmp_path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(LedgerConfig(path=path, rotate_mb=100, buffer_kb=16))
+
+    ledger.append({"kind": "note"})
+    ledger.append({"kind": "note"})
+    assert path.read_bytes() == b""
+
+    ledger.flush()
+    assert len(path.read_bytes().splitlines()) == 2
+    ledger.close()
+
+
+def test_ledger_rechecks_disk_only_when_rotation_is_due(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "ledger.jsonl"
+    first = Ledger(LedgerConfig(path=path, rotate_mb=1, buffer_kb=0))
+    second = Ledger(LedgerConfig(path=path, rotate_mb=1, buffer_kb=0))
+    refreshes = []
+    real_refresh = first._refresh_size
+    monkeypatch.setattr(first, "_refresh_size", lambda: refreshes.append(1) or real_refresh())
+    blob = "x" * 600_000
+
+    for index in range(3):
+        first.append({"kind": "note", "index": index})
+    assert refreshes == []
+
+    # Truncated from under the open handle (Hist-Clear): the stale size must not rotate.
+    first.append({"kind": "note", "blob": blob, "writer": 1})
+    path.write_bytes(b"")
+    first.append({"kind": "note", "blob": blob, "writer": 1})
+    assert refreshes == [1]
+    assert not path.with_name("ledger.r1.jsonl").exists()
+
+    # Rotated by another writer: this one follows the path instead of rotating again.
+    second.append({"kind": "note", "blob": blob, "writer": 2})
+    first.append({"kind": "note", "blob": blob, "writer": 1})
+    first.close()
+    second.close()
+
+    def writers(name: str) -> list:
+        return [entry["writer"] for entry in load_ledger(path.with_name(name))]
+
+    assert writers("ledger.r1.jsonl") == [1]
+    assert writers("ledger.r2.jsonl") == [2]
+    assert writers("ledger.jsonl") == [1]
+    assert not path.with_name("ledger.r3.jsonl").exists()
+
+
+def test_ledger_is_not_kept_alive_for_exit(tmp_path) -> None:
+    import gc
+    import weakref
+
+    ledger = Ledger(LedgerConfig(path=tmp_path / "ledger.jsonl", rotate_mb=1))
+    ledger.append({"kind": "note"})
+    dropped = weakref.ref(ledger)
+    del ledger
+    gc.collect()
+    assert dropped() is None
+
+
+def test_append_many_writes_all_lines_in_one_call(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(LedgerConfig(path=path, rotate_mb=1, buffer_kb=0))
+    ledger.append({"kind": "note", "index": -1})
+    writes = []
+    handle = ledger._handle
+    real_write = handle.write
+    monkeypatch.setattr(handle, "write", lambda data: writes.append(data) or real_write(data))
+
+    ledger.append_many({"kind": "note", "index": index} for index in range(5))
+    ledger.append_many([])
+
+    assert len(writes) == 1
+    assert [entry["index"] for entry in load_ledger(path)] == [-1, 0, 1, 2, 3, 4]
+    assert ledger._size == path.stat().st_size
+
+
+def test_dump_event_serializes_models_like_model_dump(monkeypatch) -> None:
+    from src.historian import _serialize
+
+    event = QueryEvent(
+        query="prime – ünïcode",
+        top_k=1,
+        hits=[RetrievalHit(source="a.pdf", chunk_id="c", score=0.5, preview="p")],
+        model="m",
+        max_tokens=1,
+        temperature=0.0,
+        latency_ms=1,
+        answer_chars=1,
+        markers=[Marker(type="Note", text="n")],
+    )
+
+    fast = _serialize.dump_event(event)
+    monkeypatch.setattr(_serialize, "orjson", None)
+    slow = _serialize.dump_event(event)
+
+    assert fast.endswith(b"\n") and slow.endswith(b"\n")
+    assert json.loads(fast) == json.loads(slow) == event.model_dump()
+    assert list(json.loads(fast)) == list(event.model_dump())
+
+
+def test_dumps_line_accepts_non_dict_mappings() -> None:
+    from types import MappingProxyType
+
+    from src.historian.ledger import dumps_line
+
+    line = dumps_line(MappingProxyType({"kind": "note", "n": 1}))
+
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert json.loads(line) == {"kind": "note", "n": 1}
@@ -11,3 +11,9 @@ def test_normalize_for_chunking_preserves_table_spacing():
     assert "\n\n" in normalized  # capped blank lines
     assert not normalized.startswith("\n")
     assert not normalized.endswith("\n")
+
+
+def test_normalize_for_chunking_collapses_mixed_runs():
+    raw_text = "  A\t\t\tB\r\r\r\rC    D\n\n\nE  "
+
+    assert normalize_for_chunking(raw_text) == "A  B\n\nC  D\n\nE"
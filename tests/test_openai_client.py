@@ -28,8 +28,9 @@ def test_embed_texts_retries_and_reraises(monkeypatch):
         def __init__(self, *_, **__):
             self.embeddings = DummyEmbeddings()
 
-    monkeypatch.setattr("src.llm.openai_client.OpenAI", DummyClient)
-    monkeypatch.setattr("src.llm.openai_client.time.sleep", lambda _timeout: None)
+    monkeypatch.setattr("openai.OpenAI", DummyClient)
+    sleeps = []
+    monkeypatch.setattr("src.llm.openai_client.time.sleep", sleeps.append)
 
     client = OpenAIClient(api_key="test")
 
@@ -37,4 +38,59 @@ def test_embed_texts_retries_and_reraises(monkeypatch):
         client.embed_texts(["hello"])
 
     assert call_count == 5
+    # No wait after the final failure.
+    assert len(sleeps) == 4
     assert "transient failure" in str(excinfo.value)
+
+
+def test_embed_texts_decodes_base64_into_float32_matrix(monkeypatch):
+    import base64
+    from types import SimpleNamespace
+
+    import numpy as np
+
+    rows = np.array([[0.5, -1.0, 2.0], [3.0, 0.25, -0.125]], dtype=np.float32)
+    requests = []
+
+    class DummyEmbeddings:
+        def create(self, **kwargs):
+            requests.append(kwargs)
+            data = [
+                SimpleNamespace(embedding=base64.b64encode(row.tobytes()).decode()) for row in rows
+            ]
+            return SimpleNamespace(data=data)
+
+    class DummyClient:
+        def __init__(self, *_, **__):
+            self.embeddings = DummyEmbeddings()
+
+    monkeypatch.setattr("openai.OpenAI", DummyClient)
+
+    matrix = OpenAIClient(api_key="test").embed_texts(["a", "b"])
+
+    assert requests[0]["encoding_format"] == "base64"
+    assert matrix.dtype == np.float32
+    assert np.array_equal(matrix, rows)
+
+
+def test_shared_client_is_built_once_per_api_key(monkeypatch):
+    built = []
+
+    class DummyClient:
+        def __init__(self, *_, **kwargs):
+            built.append(kwargs["api_key"])
+
+    monkeypatch.setattr("openai.OpenAI", DummyClient)
+    monkeypatch.setenv("OPENAI_API_KEY", "env-one")
+
+    first = OpenAIClient.shared(api_key="one")
+    assert OpenAIClient.shared(api_key="one") is first
+    assert OpenAIClient.shared(api_key="two") is not first
+    from_env = OpenAIClient.shared()
+    assert OpenAIClient.shared() is from_env
+
+    monkeypatch.setenv("OPENAI_API_KEY", "env-two")
+    assert OpenAIClient.shared() is not from_env
+    OpenAIClient.reset_shared()
+    assert OpenAIClient.shared(api_key="one") is not first
+    assert built == ["one", "two", "env-one", "env-two", "one"]
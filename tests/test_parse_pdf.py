@@ -2,46 +2,8 @@ import src.core.parse_pdf as parse_pdf
 from src.core.parse_pdf import extract_text_from_pdf
 
 
-def _make_pdf_bytes(text: str) -> bytes:
-    header = b"%PDF-1.4\n"
-    objects = [
-        b"1 0 obj<< /Type /Catalog /Pages 2 0 R >>endobj\n",
-        b"2 0 obj<< /Type /Pages /Kids [3 0 R] /Count 1 >>endobj\n",
-        (
-            b"3 0 obj<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 144] "
-            b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>endobj\n"
-        ),
-    ]
-    stream = f"BT /F1 12 Tf 72 72 Td ({text}) Tj ET".encode("utf-8")
-    objects.append(
-        b"4 0 obj<< /Length "
-        + str(len(stream)).encode("ascii")
-        + b" >>stream\n"
-        + stream
-        + b"\nendstream\nendobj\n"
-    )
-    objects.append(b"5 0 obj<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>endobj\n")
-
-    body = b""
-    offsets = []
-    current = len(header)
-    for obj in objects:
-        offsets.append(current)
-        body += obj
-        current += len(obj)
-
-    xref = b"xref\n0 " + str(len(objects) + 1).encode("ascii") + b"\n"
-    xref += b"0000000000 65535 f \n"
-    for offset in offsets:
-        xref += f"{offset:010d} 00000 n \n".encode("ascii")
-    trailer = b"trailer<< /Root 1 0 R /Size " + str(len(objects) + 1).encode("ascii") + b" >>\n"
-    startxref = len(header) + len(body)
-    eof = b"startxref\n" + str(startxref).encode("ascii") + b"\n%%EOF"
-    return header + body + xref + trailer + eof
-
-
-def test_extract_text_from_pdf():
-    pdf_bytes = _make_pdf_bytes("Policy Document")
+def test_extract_text_from_pdf(make_pdf_bytes):
+    pdf_bytes = make_pdf_bytes("Policy Document")
     text, page_breaks = extract_text_from_pdf(pdf_bytes)
     assert "Policy Document" in text
     assert page_breaks == [0]
@@ -51,8 +13,48 @@ def test_extract_text_empty_bytes():
     assert extract_text_from_pdf(b"") == ("", [])
 
 
+def test_extract_text_pypdfium2_fallback(monkeypatch):
+    monkeypatch.setattr(parse_pdf, "_extract_with_pypdf", lambda _bytes: "")
+    monkeypatch.setattr(parse_pdf, "_extract_with_pypdfium2", lambda _bytes: " first\fsecond ")
+
+    def _unexpected(_bytes):
+        raise AssertionError("pdfminer should not run when pypdfium2 succeeds")
+
+    monkeypatch.setattr(parse_pdf, "_extract_with_pdfminer", _unexpected)
+
+    text, page_breaks = extract_text_from_pdf(b"pdf-bytes", filename="document.pdf")
+
+    assert text == "first\n\nsecond"
+    assert page_breaks == [0, 7]
+
+
+def test_pypdfium2_extraction_skipped_when_missing(monkeypatch):
+    monkeypatch.setattr(parse_pdf, "_HAS_PYPDFIUM2", False)
+    assert parse_pdf._extract_with_pypdfium2(b"pdf-bytes") == ""
+
+
+def test_scanned_multipage_pdf_reaches_fallbacks(monkeypatch):
+    from io import BytesIO
+
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=200, height=200)
+    buffer = BytesIO()
+    writer.write(buffer)
+
+    assert parse_pdf._extract_with_pypdf(buffer.getvalue()).strip() == ""
+    monkeypatch.setattr(parse_pdf, "_extract_with_pypdfium2", lambda _bytes: "\f\f")
+    monkeypatch.setattr(parse_pdf, "_extract_with_pdfminer", lambda _bytes: "")
+    monkeypatch.setattr(parse_pdf, "_extract_with_ocr", lambda _bytes, filename=None: "scanned")
+
+    assert extract_text_from_pdf(buffer.getvalue()) == ("scanned", [0])
+
+
 def test_extract_text_pdfminer_fallback(monkeypatch):
-    monkeypatch.setattr(parse_pdf, "_extract_with_pypdf", lambda _bytes: [])
+    monkeypatch.setattr(parse_pdf, "_extract_with_pypdf", lambda _bytes: "")
+    monkeypatch.setattr(parse_pdf, "_extract_with_pypdfium2", lambda _bytes: "")
     monkeypatch.setattr(parse_pdf, "_extract_with_pdfminer", lambda _bytes: " fallback text ")
 
     text, page_breaks = extract_text_from_pdf(b"pdf-bytes", filename="document.pdf")
@@ -62,14 +64,15 @@ def test_extract_text_pdfminer_fallback(monkeypatch):
 
 
 def test_extract_text_ocr_fallback(monkeypatch):
-    monkeypatch.setattr(parse_pdf, "_extract_with_pypdf", lambda _bytes: [])
+    monkeypatch.setattr(parse_pdf, "_extract_with_pypdf", lambda _bytes: "")
+    monkeypatch.setattr(parse_pdf, "_extract_with_pypdfium2", lambda _bytes: "")
     monkeypatch.setattr(parse_pdf, "_extract_with_pdfminer", lambda _bytes: "")
 
     calls = []
 
     def _fake_ocr(bytes_in: bytes, *, filename=None):
         calls.append((bytes_in, filename))
-        return [" ocr text "]
+        return " ocr text "
 
     monkeypatch.setattr(parse_pdf, "_extract_with_ocr", _fake_ocr)
 
@@ -78,3 +81,88 @@ def test_extract_text_ocr_fallback(monkeypatch):
     assert text == "ocr text"
     assert page_breaks == [0]
     assert calls == [(b"pdf-bytes", "ocr.pdf")]
+
+
+def test_extract_text_from_file_object(make_pdf_bytes):
+    from io import BytesIO
+
+    stream = BytesIO(make_pdf_bytes("Policy Document"))
+    stream.seek(5)
+
+    text, page_breaks = extract_text_from_pdf(stream)
+
+    assert "Policy Document" in text
+    assert page_breaks == [0]
+    assert extract_text_from_pdf(BytesIO()) == ("", [])
+
+
+def test_page_breaks_follow_sentinel_separated_pages():
+    text, page_breaks = parse_pdf._normalize_with_page_breaks("  One\t\tpage\fTwo\r\r\r\fThree  ")
+
+    assert text == "One  page\n\nTwo\n\n\n\nThree"
+    assert page_breaks == [0, 11, 18]
+    assert [text[start:].split("\n")[0] for start in page_breaks] == ["One  page", "Two", "Three"]
+
+
+def test_extract_text_reports_each_page_offset(make_pdf_bytes):
+    from io import BytesIO
+
+    from pypdf import PdfReader, PdfWriter
+
+    writer = PdfWriter()
+    for label in ("Alpha", "Bravo", "Charlie", "Delta"):
+        writer.add_page(PdfReader(BytesIO(make_pdf_bytes(f"Page {label}"))).pages[0])
+    buffer = BytesIO()
+    writer.write(buffer)
+
+    text, page_breaks = extract_text_from_pdf(buffer.getvalue())
+
+    assert [text[start:].split("\n")[0] for start in page_breaks] == [
+        "Page Alpha",
+        "Page Bravo",
+        "Page Charlie",
+        "Page Delta",
+    ]
+
+
+def test_ocr_skipped_when_dependency_missing(monkeypatch, caplog):
+    monkeypatch.setattr(parse_pdf, "_MISSING_OCR_MODULE", "ocrmypdf")
+
+    assert parse_pdf._extract_with_ocr(b"pdf-bytes", filename="scan.pdf") == ""
+    assert "missing ocrmypdf" in caplog.text
+
+
+def test_ocr_output_is_parsed_from_scratch_file(monkeypatch, tmp_path, make_pdf_bytes):
+    import shutil
+    import sys
+    import types
+
+    seen_dirs = []
+
+    def _fake_ocr(input_path, output_path, **_kwargs):
+        seen_dirs.append(str(tmp_path) in input_path)
+        shutil.copyfile(input_path, output_path)
+
+    monkeypatch.setitem(sys.modules, "ocrmypdf", types.SimpleNamespace(ocr=_fake_ocr))
+    monkeypatch.setattr(parse_pdf, "_MISSING_OCR_MODULE", None)
+    monkeypatch.setattr(parse_pdf, "_OCR_TMP_DIR", str(tmp_path))
+
+    text = parse_pdf._extract_with_ocr(make_pdf_bytes("Scanned Policy"), filename="scan.pdf")
+
+    assert "Scanned Policy" in text
+    assert seen_dirs == [True]
+
+
+def test_pdfminer_writer_normalizes_pages_as_they_stream():
+    raw = "\n Page\t\tone   text\r\r\r\r\fPage two\n\n\n\n\f\f  last  "
+    writer = parse_pdf._PageNormalizingWriter()
+    for start in range(0, len(raw), 3):
+        writer.write(raw[start : start + 3])
+
+    assert writer.getvalue() == parse_pdf.normalize_for_chunking(raw)
+
+
+def test_pdfminer_extraction_returns_normalized_text(make_pdf_bytes):
+    text = parse_pdf._extract_with_pdfminer(make_pdf_bytes("Policy   Document"))
+
+    assert text == "Policy  Document"
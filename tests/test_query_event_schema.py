@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import json
-
 from src.historian.schema import Marker, QueryEvent, RetrievalHit
 
 
@@ -39,7 +37,7 @@ def test_query_event_serialization() -> None:
         markers=[Marker(type="Decision", text="Policy response")],
     )
 
-    payload = json.loads(event.model_dump_json())
+    payload = event.model_dump(mode="json")
     assert payload["kind"] == "query"
     assert isinstance(payload["hits"], list)
     assert len(payload["hits"]) == 2
@@ -50,3 +48,56 @@ def test_query_event_serialization() -> None:
     assert payload["latency_ms"] == 987
     assert payload["est_input_tokens"] == 1500
     assert payload["est_usd"] == 0.12
+
+
+def test_tz_now_matches_phoenix_zone(monkeypatch) -> None:
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+
+    from src.historian import schema
+
+    for nanos in (1_700_000_000_123_456_789, 1_700_000_000_999_999_000, 1_719_000_000_000_000_000):
+        monkeypatch.setattr(schema.time, "time_ns", lambda nanos=nanos: nanos)
+        expected = datetime.fromtimestamp(nanos // 1000 / 1_000_000, ZoneInfo("America/Phoenix"))
+        assert datetime.fromisoformat(schema.tz_now()) == expected
+        assert schema.tz_now().endswith("-07:00")
+
+
+def test_event_helpers_match_model_dump() -> None:
+    from src.historian.schema import IngestEvent, make_ingest_event, make_query_event
+
+    hit = RetrievalHit(source="a.pdf", chunk_id="c", score=0.5, preview="p", page_start=1)
+    markers = [Marker(type="Note", text="n")]
+    query_fields = dict(
+        query="q",
+        top_k=1,
+        hits=[hit],
+        model="m",
+        max_tokens=10,
+        temperature=0.2,
+        latency_ms=3,
+        answer_chars=4,
+        est_usd=0.01,
+        markers=markers,
+    )
+    ingest_fields = dict(
+        filename="a.pdf", chunks=2, embed_batches=1, duration_ms=5, markers=markers
+    )
+
+    for made, model in (
+        (make_query_event(**query_fields), QueryEvent(**query_fields).model_dump()),
+        (make_ingest_event(**ingest_fields), IngestEvent(**ingest_fields).model_dump()),
+    ):
+        assert list(made) == list(model)
+        for volatile in ("ts", "run"):
+            made.pop(volatile)
+            model.pop(volatile)
+        assert made == model
+
+    from src.historian.schema import make_retrieval_hit
+
+    hit_record = make_retrieval_hit(
+        source="a.pdf", chunk_id="c", score=0.5, preview="p", page_start=1
+    )
+    assert hit_record == hit.model_dump()
+    assert make_query_event(**{**query_fields, "hits": [hit_record]})["hits"][0] is hit_record
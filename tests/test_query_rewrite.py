@@ -1,4 +1,4 @@
-from src.core.query_rewrite import expand_query
+from src.core.query_rewrite import expand_query, match_structured_phrase, normalize_query
 
 
 def test_expand_query_adds_policy_number_synonyms():
@@ -17,3 +17,46 @@ def test_expand_query_handles_total_premium():
 def test_expand_query_no_change_when_not_triggered():
     query = "Tell me about coverage limits"
     assert expand_query(query) == query
+
+
+def test_expand_query_detects_overlapping_triggers_in_rule_order():
+    expanded = expand_query("estimated total premium at inception")
+
+    assert expanded == (
+        'estimated total premium at inception "premium total" "premium overall" '
+        '"payable at inception premium" "inception premium"'
+    )
+
+
+def test_append_synonyms_skips_query_terms_and_repeats():
+    from src.core.query_rewrite import _append_synonyms
+
+    additions = _append_synonyms(
+        ["Policy #"], "what is the policy id", ["policy #", "policy no", "POLICY NO", "policy id"]
+    )
+
+    assert additions == ["policy no"]
+
+
+def test_match_structured_phrase_prefers_longest():
+    assert match_structured_phrase("what is the estimated total premium?") == (
+        "estimated total premium"
+    )
+    assert match_structured_phrase("policy number and premium at inception") == (
+        "premium at inception"
+    )
+    assert match_structured_phrase("total premium or policy number") == "total premium"
+    assert match_structured_phrase("coverage limits") is None
+
+
+def test_match_structured_phrase_ranks_overlapping_phrases():
+    # "total premium" overlaps "premium at inception"; the longer phrase still wins.
+    assert match_structured_phrase("what is the total premium at inception?") == (
+        "premium at inception"
+    )
+
+
+def test_normalize_query_collapses_whitespace_and_case():
+    normalized = normalize_query("  What is the  POLICY\tNumber? ")
+    assert normalized == "what is the policy number?"
+    assert match_structured_phrase(normalized) == "policy number"
@@ -1,4 +1,11 @@
-from src.core.redact import redact_text
+import pytest
+
+from src.core.redact import (
+    REDACTION_PATTERNS,
+    REDACTION_TOKENS,
+    _env_default_enabled,
+    redact_text,
+)
 
 
 def test_redact_patterns():
@@ -13,3 +20,33 @@ def test_redact_patterns():
 def test_redaction_disabled():
     text = "Email: person@example.com"
     assert redact_text(text, enabled=False) == text
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Mail A.Person@Example.COM, call (555) 123-4567 or +1 555.123.4567, "
+        "policy 1234-5678, visit 221 baker st or 9 Elm Rd.",
+        # Overlapping spans: the higher-priority pattern claims the shared characters.
+        "555 123-4567.x@foo.com",
+        "12 1234-5678 Street",
+        "No contact details here.",
+    ],
+)
+def test_redact_matches_sequential_substitution(text):
+    expected = text
+    for key, pattern in REDACTION_PATTERNS.items():
+        expected = pattern.sub(REDACTION_TOKENS[key], expected)
+
+    assert redact_text(text, enabled=True) == expected
+
+
+def test_redaction_default_reads_env_once(monkeypatch):
+    monkeypatch.setenv("REDACT_PII", "false")
+    _env_default_enabled.cache_clear()
+    try:
+        assert redact_text("Email: person@example.com") == "Email: person@example.com"
+        monkeypatch.setenv("REDACT_PII", "true")
+        assert redact_text("Email: person@example.com") == "Email: person@example.com"
+    finally:
+        _env_default_enabled.cache_clear()
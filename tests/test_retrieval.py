@@ -1,3 +1,8 @@
+import json
+
+import numpy as np
+import pytest
+
 from src.core.retrieval import Retriever
 from src.store.faiss_store import FaissVectorStore, Metadata
 
@@ -16,3 +21,342 @@ def test_retrieval_orders_by_score(tmp_path):
     results = retriever.search([1.0, 0.0], top_k=2, redact=False)
     assert results[0].source == "doc1.pdf"
     assert len(results) == 2
+
+
+def test_store_indexes_fields_across_reload(tmp_path):
+    index_path = tmp_path / "index.faiss"
+    meta_path = tmp_path / "meta.pkl"
+    store = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    store.add(
+        embeddings=[[1.0, 0.0], [0.0, 1.0]],
+        metadatas=[
+            Metadata(document_id="doc1", chunk_id="c1", text="alpha", source="doc1.pdf"),
+            Metadata(
+                document_id="doc1",
+                chunk_id="c2",
+                text="Policy Number: ABC-1",
+                source="doc1.pdf",
+                page_start=2,
+                page_end=3,
+                fields={"policy_number": "ABC-1"},
+            ),
+        ],
+    )
+
+    found = store.find_field("policy_number")
+    assert found is not None and found.chunk_id == "c2"
+    assert found.page_label == "Pages 2–3"
+    assert store.find_field("premium_at_inception") is None
+
+    store.flush()
+    reloaded = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    reloaded_found = reloaded.find_field("policy_number")
+    assert reloaded_found is not None and reloaded_found.chunk_id == "c2"
+    # The label is formatted once when stored and read back as written.
+    assert reloaded_found.page_label == "Pages 2–3"
+    rows = [json.loads(line) for line in meta_path.read_text(encoding="utf-8").splitlines()]
+    assert [row["page_label"] for row in rows] == ["", "Pages 2–3"]
+    assert reloaded.find_field("premium_at_inception") is None
+
+
+def test_store_loads_legacy_metadata_list(tmp_path):
+    import pickle
+
+    index_path = tmp_path / "index.faiss"
+    meta_path = tmp_path / "meta.pkl"
+    store = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    store.add(
+        embeddings=[[1.0, 0.0]],
+        metadatas=[
+            Metadata(
+                document_id="doc1",
+                chunk_id="c1",
+                text="alpha",
+                source="doc1.pdf",
+                fields={"policy_number": "P-1"},
+            )
+        ],
+    )
+    store.flush()
+    with meta_path.open("wb") as fh:
+        pickle.dump(store.metadata, fh)
+
+    reloaded = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    assert reloaded.size() == 1
+    assert reloaded.row(0).fields == {"policy_number": "P-1"}
+    assert reloaded.search([1.0, 0.0], 1)[0][1].chunk_id == "c1"
+
+
+def test_store_switches_to_ivf_past_threshold(tmp_path, monkeypatch):
+    import faiss
+    import numpy as np
+
+    from src.store import faiss_store
+
+    monkeypatch.setattr(faiss_store, "IVF_THRESHOLD", 800)
+    store = FaissVectorStore(index_path=tmp_path / "index.faiss", meta_path=tmp_path / "meta.pkl")
+    vectors = np.random.default_rng(0).standard_normal((1000, 8)).astype("float32")
+    store.add(
+        embeddings=vectors.tolist(),
+        metadatas=[
+            Metadata(document_id="doc", chunk_id=f"c{i}", text=f"t{i}", source="doc.pdf")
+            for i in range(1000)
+        ],
+    )
+
+    assert faiss.extract_index_ivf(store.index).nlist == 63
+    assert isinstance(store.index, faiss.IndexIVFScalarQuantizer)
+    results = store.search(vectors[5].tolist(), 1)
+    assert results[0][1].chunk_id == "c5"
+
+
+def test_store_quantizes_flat_index_once_trainable(tmp_path, monkeypatch):
+    import faiss
+    import numpy as np
+
+    from src.store import faiss_store
+
+    monkeypatch.setattr(faiss_store, "SQ_TRAIN_SIZE", 256)
+    monkeypatch.setattr(faiss_store, "IVF_THRESHOLD", 0)
+    index_path = tmp_path / "index.faiss"
+    meta_path = tmp_path / "meta.pkl"
+    store = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    vectors = np.random.default_rng(2).standard_normal((300, 16)).astype("float32")
+    metadatas = [
+        Metadata(document_id="doc", chunk_id=f"c{i}", text=f"t{i}", source="doc.pdf")
+        for i in range(300)
+    ]
+    store.add(vectors[:200].copy(), metadatas[:200])
+    assert isinstance(store.index, faiss.IndexFlatIP)
+
+    store.add(vectors[200:].copy(), metadatas[200:])
+
+    assert isinstance(store.index, faiss.IndexScalarQuantizer)
+    assert store.index.ntotal == 300
+    store.flush()
+    reloaded = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    assert reloaded.search(vectors[250].tolist(), 1)[0][1].chunk_id == "c250"
+
+
+def test_store_keeps_exact_vectors_until_ann_rebuild(tmp_path, monkeypatch):
+    import faiss
+    import numpy as np
+
+    from src.store import faiss_store
+
+    monkeypatch.setattr(faiss_store, "SQ_TRAIN_SIZE", 50)
+    monkeypatch.setattr(faiss_store, "IVF_THRESHOLD", 400)
+    monkeypatch.setattr(faiss_store, "IVF_CODEC", "Flat")
+    store = FaissVectorStore(index_path=tmp_path / "index.faiss", meta_path=tmp_path / "meta.pkl")
+    vectors = np.random.default_rng(3).standard_normal((400, 8)).astype("float32")
+    faiss.normalize_L2(vectors)
+    metadatas = [
+        Metadata(document_id="doc", chunk_id=f"c{i}", text=f"t{i}", source="doc.pdf")
+        for i in range(400)
+    ]
+
+    store.add(vectors[:100], metadatas[:100])
+    assert isinstance(store.index, faiss.IndexFlatIP)
+
+    store.add(vectors[100:], metadatas[100:])
+    assert isinstance(store.index, faiss.IndexIVFFlat)
+    # The IVF lists were filled from the exact vectors, not int8 reconstructions.
+    ivf = faiss.extract_index_ivf(store.index)
+    ivf.make_direct_map()
+    np.testing.assert_allclose(ivf.reconstruct_n(0, 400), vectors, rtol=1e-5, atol=1e-6)
+
+
+def test_store_switches_to_hnsw_when_configured(tmp_path, monkeypatch):
+    import faiss
+    import numpy as np
+
+    from src.store import faiss_store
+
+    monkeypatch.setattr(faiss_store, "IVF_THRESHOLD", 100)
+    monkeypatch.setattr(faiss_store, "ANN_KIND", "hnsw")
+    index_path = tmp_path / "index.faiss"
+    meta_path = tmp_path / "meta.pkl"
+    store = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    vectors = np.random.default_rng(1).standard_normal((150, 8)).astype("float32")
+    store.add(
+        embeddings=vectors,
+        metadatas=[
+            Metadata(document_id="doc", chunk_id=f"c{i}", text=f"t{i}", source="doc.pdf")
+            for i in range(150)
+        ],
+    )
+
+    assert isinstance(store.index, faiss.IndexHNSWFlat)
+    store.flush()
+    reloaded = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    assert reloaded.index.hnsw.efSearch == faiss_store.HNSW_EF_SEARCH
+    assert reloaded.search(vectors[7] * 2, 1)[0][1].chunk_id == "c7"
+
+
+def test_store_batches_persistence_until_flush(tmp_path, monkeypatch):
+    from src.store import faiss_store
+
+    monkeypatch.setattr(faiss_store, "PERSIST_EVERY", 3)
+    monkeypatch.setattr(faiss_store, "PERSIST_INTERVAL", 3600.0)
+    index_path = tmp_path / "index.faiss"
+    meta_path = tmp_path / "meta.jsonl"
+    store = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+
+    def _add(chunk_id, vector):
+        store.add([vector], [Metadata(document_id="d", chunk_id=chunk_id, text="t", source="s")])
+
+    _add("c1", [1.0, 0.0])
+    _add("c2", [0.0, 1.0])
+    assert not index_path.exists() and not meta_path.exists()
+
+    _add("c3", [1.0, 1.0])
+    assert len(meta_path.read_bytes().splitlines()) == 3
+
+    _add("c4", [1.0, -1.0])
+    store.flush()
+    assert len(meta_path.read_bytes().splitlines()) == 4
+    reloaded = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    assert reloaded.size() == 4
+    assert reloaded.search([1.0, -1.0], 1)[0][1].chunk_id == "c4"
+
+
+def test_exit_flush_holds_stores_weakly(tmp_path, monkeypatch):
+    import gc
+    import weakref
+
+    from src.store import faiss_store
+
+    monkeypatch.setattr(faiss_store, "PERSIST_INTERVAL", 3600.0)
+    meta_path = tmp_path / "meta.jsonl"
+    store = FaissVectorStore(index_path=tmp_path / "index.faiss", meta_path=meta_path)
+    store.add([[1.0, 0.0]], [Metadata(document_id="d", chunk_id="c1", text="t", source="s")])
+    assert not meta_path.exists()
+
+    faiss_store._flush_live_stores()
+    assert len(meta_path.read_bytes().splitlines()) == 1
+
+    dropped = weakref.ref(store)
+    del store
+    gc.collect()
+    assert dropped() is None
+
+
+def test_store_reads_persisted_rows_lazily_and_drops_torn_tail(tmp_path):
+    index_path = tmp_path / "index.faiss"
+    meta_path = tmp_path / "meta.jsonl"
+    store = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    store.add(
+        [[1.0, 0.0], [0.0, 1.0]],
+        [
+            Metadata(document_id="d", chunk_id="c1", text="policy_number: x", source="s"),
+            Metadata(
+                document_id="d",
+                chunk_id="c2",
+                text="t",
+                source="s",
+                fields={"policy_number": "P-2"},
+            ),
+        ],
+    )
+    store.flush()
+    with meta_path.open("ab") as fh:
+        fh.write(b'{"document_id": "d", "chu')
+
+    reloaded = FaissVectorStore(index_path=index_path, meta_path=meta_path)
+    assert reloaded.size() == 2
+    assert reloaded.row(1).fields == {"policy_number": "P-2"}
+    assert reloaded.find_field("policy_number").chunk_id == "c2"
+
+    reloaded.add(
+        [[1.0, 1.0]],
+        [Metadata(document_id="d", chunk_id="c3", text="t", source="s", fields={"x": "1"})],
+    )
+    assert reloaded.row(2).chunk_id == "c3"
+    assert reloaded.find_field("x").chunk_id == "c3"
+    reloaded.flush()
+    assert meta_path.read_bytes().endswith(b"\n")
+    assert [
+        meta.chunk_id
+        for meta in FaissVectorStore(index_path=index_path, meta_path=meta_path).metadata
+    ] == ["c1", "c2", "c3"]
+
+
+def test_search_batch_matches_single_queries(tmp_path):
+    store = FaissVectorStore(index_path=tmp_path / "index.faiss", meta_path=tmp_path / "meta.pkl")
+    assert store.search_batch([[1.0, 0.0]], 1) == [[]]
+    store.add(
+        [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+        [Metadata(document_id="d", chunk_id=f"c{i}", text="t", source="s") for i in range(3)],
+    )
+    queries = [[1.0, 0.1], [0.1, 1.0]]
+
+    batched = store.search_batch(queries, 5)
+
+    assert len(batched[0]) == 3
+    for query, results in zip(queries, batched, strict=True):
+        single = store.search(query, 5)
+        assert [meta.chunk_id for _score, meta in results] == [
+            meta.chunk_id for _score, meta in single
+        ]
+        assert [score for score, _meta in results] == [score for score, _meta in single]
+
+
+def test_search_reuses_buffer_without_touching_query(tmp_path):
+    store = FaissVectorStore(index_path=tmp_path / "index.faiss", meta_path=tmp_path / "meta.pkl")
+    assert store.search([1.0, 0.0], 1) == []
+    store.add(
+        [[1.0, 0.0], [0.0, 1.0]],
+        [Metadata(document_id="d", chunk_id=f"c{i}", text="t", source="s") for i in range(2)],
+    )
+    query = np.array([3.0, 0.0], dtype=np.float32)
+
+    first = store.search(query, 1)
+    buffer = store._query_buffer
+    second = store.search([0.0, 2.0], 1)
+
+    assert query.tolist() == [3.0, 0.0]
+    assert store._query_buffer is buffer
+    assert first[0][1].chunk_id == "c0"
+    assert second[0][1].chunk_id == "c1"
+    assert first[0][0] == pytest.approx(1.0)
+
+
+def test_search_returns_columnar_batch(tmp_path):
+    store = FaissVectorStore(index_path=tmp_path / "index.faiss", meta_path=tmp_path / "meta.pkl")
+    store.add(
+        embeddings=[[1.0, 0.0], [0.0, 1.0]],
+        metadatas=[
+            Metadata(
+                document_id="doc1",
+                chunk_id="c1",
+                text="mail a@b.com",
+                source="doc1.pdf",
+                page_start=2,
+            ),
+            Metadata(document_id="doc2", chunk_id="c2", text="beta", source="doc2.pdf"),
+        ],
+    )
+    retriever = Retriever(store)
+
+    batch = retriever.search([1.0, 0.0], top_k=2, redact=True)
+
+    assert batch.chunk_ids == ["c1", "c2"]
+    assert batch.texts[0] == "mail [REDACTED_EMAIL]"
+    assert batch.scores.dtype == "float32"
+    assert [chunk.chunk_id for chunk in batch] == batch.chunk_ids
+    assert retriever.build_context(batch) == retriever.build_context(list(batch))
+    assert retriever.build_context(batch)[0] == (
+        "Source: doc1.pdf | Chunk: c1 | Page 2\nScore: 1.0000\nmail [REDACTED_EMAIL]"
+    )
+
+
+def test_store_add_leaves_caller_matrix_untouched(tmp_path):
+    import numpy as np
+
+    store = FaissVectorStore(index_path=tmp_path / "index.faiss", meta_path=tmp_path / "meta.pkl")
+    matrix = np.array([[3.0, 4.0]], dtype=np.float32)
+
+    store.add(matrix, [Metadata(document_id="d", chunk_id="c", text="t", source="s")])
+
+    assert matrix.tolist() == [[3.0, 4.0]]
+    assert store.search([3.0, 4.0], 1)[0][1].chunk_id == "c"
@@ -0,0 +1,46 @@
+from src.core.semantic_cache import SemanticCache
+
+
+def test_semantic_cache_hits_similar_embeddings():
+    cache = SemanticCache(threshold=0.95, max_entries=8)
+    cache.store([1.0, 0.0], "cached answer", key=3)
+
+    assert cache.lookup([0.99, 0.05], key=3) == "cached answer"
+    assert cache.lookup([0.99, 0.05], key=5) is None
+    assert cache.lookup([0.0, 1.0], key=3) is None
+
+
+def test_semantic_cache_clear_and_disable():
+    cache = SemanticCache(threshold=0.9, max_entries=8)
+    cache.store([1.0, 0.0], "answer")
+    cache.clear()
+    assert cache.lookup([1.0, 0.0]) is None
+
+    disabled = SemanticCache(threshold=0.9, max_entries=0)
+    disabled.store([1.0, 0.0], "answer")
+    assert len(disabled) == 0
+    assert disabled.lookup([1.0, 0.0]) is None
+
+
+def test_semantic_cache_exact_text_lookup():
+    cache = SemanticCache(threshold=0.95, max_entries=8)
+    cache.store([1.0, 0.0], "answer", key=3, text="what is covered?")
+
+    assert cache.lookup_text("what is covered?", key=3) == "answer"
+    assert cache.lookup_text("what is covered?", key=4) is None
+    cache.clear()
+    assert cache.lookup_text("what is covered?", key=3) is None
+
+
+def test_semantic_cache_evicts_oldest_entry_when_full():
+    cache = SemanticCache(threshold=0.95, max_entries=2)
+    cache.store([1.0, 0.0, 0.0], "first", text="one")
+    cache.store([0.0, 1.0, 0.0], "second", text="two")
+    cache.store([0.0, 0.0, 1.0], "third", text="three")
+
+    assert len(cache) == 2
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+    assert cache.lookup_text("one") is None
+    assert cache.lookup([0.0, 1.0, 0.0]) == "second"
+    assert cache.lookup_text("two") == "second"
+    assert cache.lookup([0.0, 0.0, 1.0]) == "third"
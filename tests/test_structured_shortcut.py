@@ -26,8 +26,10 @@ def structured_client(tmp_path, monkeypatch):
         captured_queries.append(q)
         return [1.0, 0.0]
 
-    app_module.embedding_service.embed_query = fake_embed_query
-    app_module.embedding_service.embed_documents = lambda texts: [[1.0, 0.0] for _ in texts]
+    monkeypatch.setattr(app_module.embedding_service, "embed_query", fake_embed_query)
+    monkeypatch.setattr(
+        app_module.embedding_service, "embed_documents", lambda texts: [[1.0, 0.0] for _ in texts]
+    )
 
     chat_called = {"value": False}
 
@@ -35,7 +37,7 @@ def structured_client(tmp_path, monkeypatch):
         chat_called["value"] = True
         raise AssertionError("Chat should not be invoked for structured shortcut")
 
-    app_module.openai_client.chat = fake_chat
+    monkeypatch.setattr(app_module.openai_client, "chat", fake_chat)
 
     app_module.vector_store.add(
         embeddings=[[1.0, 0.0]],
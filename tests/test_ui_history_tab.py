@@ -28,6 +28,9 @@ class DummyStreamlit:
     def set_page_config(self, *args, **kwargs) -> None:  # noqa: D401 - stub
         return None
 
+    def cache_data(self, *args, **kwargs):
+        return lambda func: func
+
     def title(self, *args, **kwargs) -> None:  # noqa: D401 - stub
         return None
 
@@ -67,8 +70,8 @@ class DummyStreamlit:
     def json(self, value) -> None:
         self.captured["json"] = value
 
-    def code(self, *args, **kwargs) -> None:
-        return None
+    def code(self, body, *args, **kwargs) -> None:
+        self.captured.setdefault("code", []).append(body)
 
     def info(self, message) -> None:
         self.captured["info"] = message
@@ -128,4 +131,19 @@ def test_history_tab_loads_summary(monkeypatch, tmp_path, patch_streamlit):
     assert patch_streamlit.captured["json"]["ingest_events"] == 1
     assert patch_streamlit.captured["json"]["query_events"] == 1
     assert "Ledger" not in patch_streamlit.captured.get("info", "")
+    assert patch_streamlit.captured["code"] == [ingest_payload + "\n" + query_payload]
     assert module is not None
+
+
+def test_raw_events_tail_keeps_whole_lines(tmp_path, patch_streamlit):
+    import importlib
+
+    module = importlib.import_module("src.ui.app_streamlit")
+    ledger_path = tmp_path / "ledger.jsonl"
+    ledger_path.write_text('{"n": 1}\n{"n": 22}\n{"n": 333}\n', encoding="utf-8")
+
+    assert module._raw_events_tail(ledger_path, 1024) == (
+        '{"n": 1}\n{"n": 22}\n{"n": 333}',
+        False,
+    )
+    assert module._raw_events_tail(ledger_path, 14) == ('{"n": 333}', True)